@@ -0,0 +1,25 @@
+// Angular-style services: HttpClient, legacy $http, environment base URLs.
+const environment = { production: true, apiUrl: "https://api.shop.example.com/" };
+const API_BASE = "https://api.shop.example.com/v2/";
+
+class ProductService {
+  constructor(http) { this.http = http; }
+  list(page) { return this.http.get("/api/products", { params: { page } }); }
+  get(id) { return this.http.get(`/api/products/${id}`); }
+  create(p) { return this.http.post("/api/products", p); }
+  update(p) { return this.http.put("/api/products/" + p.id, p); }
+  remove(id) { return this.http.delete("/api/products/" + id); }
+  reviews(id) { return this.request("catalog/products/reviews", id); }
+  related(id) { return this.request("catalog/products/related/list", id); }
+  request(path, id) { return this.http.get(API_BASE + "catalog/search/" + id); }
+}
+
+angular.module("legacy", []).service("Orders", function ($http) {
+  this.all = () => $http.get("/api/legacy/orders");
+  this.save = (o) => $http.post("/api/legacy/orders/save", o);
+  this.cancel = (id) => $http({ method: "DELETE", url: "/api/legacy/orders/" + id });
+});
+
+class AuthInterceptor {
+  refresh(http) { return http.post("/oauth/token", { grant_type: "refresh_token" }); }
+}
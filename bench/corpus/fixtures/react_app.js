@@ -0,0 +1,37 @@
+// React-style app: fetch, axios instances, Apollo/urql hooks and gql documents.
+import axios from "axios";
+import { gql, useQuery, useMutation } from "@apollo/client";
+
+const api = axios.create({ baseURL: "https://api.example.com/v1", timeout: 10000 });
+const billing = axios.create({ baseURL: "https://billing.example.com" });
+
+export function useCart() {
+  const load = () => fetch("/api/cart", { credentials: "include" });
+  const add = (id) => fetch("/api/cart/items", { method: "POST", body: JSON.stringify({ id }) });
+  const drop = (id) => fetch(`/api/cart/items/${id}`, { method: "DELETE" });
+  return { load, add, drop };
+}
+
+export const users = {
+  me: () => api.get("/users/me"),
+  update: (u) => api.patch("users/me", u),
+  avatar: (f) => api.post("/users/me/avatar", f),
+  invoices: () => billing.get("/invoices?status=open"),
+  search: (q) => axios.get("/api/search?q=" + q),
+};
+
+axios({ url: "/api/audit/events", method: "post", data: {} });
+
+const GET_PROFILE = gql`
+  query GetProfile($id: ID!) { profile(id: $id) { id name } }
+`;
+const UPDATE_PROFILE = gql`
+  mutation UpdateProfile($input: ProfileInput!) { updateProfile(input: $input) { id } }
+`;
+export function Profile({ id }) {
+  const { data } = useQuery(GET_PROFILE, { variables: { id } });
+  const [save] = useMutation(UPDATE_PROFILE);
+  return data;
+}
+const client = new ApolloClient({ uri: "https://graph.example.com/graphql" });
+const sub = gql`subscription OnOrder { orderCreated { id } }`;
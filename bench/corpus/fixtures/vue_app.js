@@ -0,0 +1,39 @@
+// Vue-style app plus the odds and ends: jQuery, XHR, superagent, JSON-RPC,
+// tRPC, gRPC-web and Socket.IO.
+import Vue from "vue";
+import request from "superagent";
+
+new Vue({
+  el: "#app",
+  methods: {
+    load() { return this.$http.get("/api/vue/dashboard"); },
+    save(x) { return request.post("/api/vue/settings").send(x); },
+    poll() { return superagent.get("/api/vue/notifications?since=0"); },
+  },
+});
+
+$.ajax({ url: "/rest/v1/legacy/profile", type: "PUT", data: {} });
+$.get("/rest/v1/legacy/menu");
+$.post("/rest/v1/legacy/feedback", { text: "" });
+$.getJSON("/rest/v1/legacy/config.json");
+
+var xhr = new XMLHttpRequest();
+xhr.open("POST", "/api/upload/chunk?part=1", true);
+xhr.send(blob);
+
+fetch("/jsonrpc", {
+  method: "POST",
+  body: JSON.stringify({ jsonrpc: "2.0", method: "wallet_getBalance", params: [], id: 1 }),
+});
+const rpc = { jsonrpc: "2.0", method: "wallet_transfer", id: 2 };
+
+const trpc = createTRPCProxyClient({ links: [httpBatchLink({ url: "/api/trpc" })] });
+trpc.user.byId.query(1);
+trpc.post.create.mutate({ title: "x" });
+
+const grpc = new GreeterClient("https://grpc.example.com:8443");
+fetch("/helloworld.Greeter/SayHello", { method: "POST", headers: { "content-type": "application/grpc-web+proto" } });
+
+const socket = io("/realtime");
+socket.emit("chat:message", { text: "hi" });
+socket.on("chat:typing", () => {});
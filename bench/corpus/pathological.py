@@ -0,0 +1,27 @@
+from __future__ import annotations
+
+# Inputs that drive a backtracking pattern towards quadratic time: repeated
+# openings that never close, and spans crowded with near-misses. Each case
+# takes a repeat count and grows linearly with it, so extraction time should
+# too.
+CASES = {
+    # axios({ ... with no closing brace, and a run of url keys with no method.
+    "axios-obj-unclosed": lambda n: "axios({" * n,
+    "axios-obj-urls": lambda n: "axios({" + 'url:"/a",' * n,
+    # x=a.b.create( openings with no baseURL, and one long create chain.
+    "axios-create-openings": lambda n: "x=a.create(" * n,
+    "axios-create-chain": lambda n: "x=" + ".".join(["a.create"] * n) + "(",
+    "jquery-ajax-urls": lambda n: "$.ajax({" + 'url:"/a",' * n,
+    "jsonrpc-unclosed": lambda n: "jsonrpc," * n,
+    "jsonrpc-methods": lambda n: 'method:"a",' * n,
+    "fetch-opts-unclosed": lambda n: 'fetch("/a",{' * n,
+    "fetch-opts-keys": lambda n: 'fetch("/a",{' + "method:x," * n,
+    # Unterminated literals full of path separators.
+    "abs-url-unterminated": lambda n: '"https://h' + "/a" * n + "%",
+    "rel-path-unterminated": lambda n: '"/x' + "/api/a" * n,
+    "var-base-concat": lambda n: 'var b="https://h/";' + "b+b+" * n,
+    # Base constants and path literals growing together: joining every path
+    # with every base is quadratic unless capped.
+    "var-base-cross-product": lambda n: "".join('var b%d="https://h%d/";' % (i, i) for i in range(n // 20))
+    + "'a/b/c'," * n,
+}
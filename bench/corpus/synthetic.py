@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import os
+import random
+
+# Bump whenever the generator's output changes, so stored baselines are only
+# compared against bundles built the same way.
+CORPUS_VERSION = 1
+
+SIZES_MB = (1, 5, 20)
+
+_GENERATED = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".generated")
+
+_IDENT = "abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ_$"
+
+# Call sites sprinkled through the filler, roughly one per 2 KB, in the
+# shapes a minifier leaves them.
+_CALLS = (
+    'fetch("/api/v1/{w}/"+{i},{{method:"POST",body:JSON.stringify({i})}})',
+    'fetch(`/api/v2/{w}/${{{i}}}`)',
+    '{i}.get("/api/{w}/list",{{params:{{page:{n}}}}})',
+    'axios.post("/api/{w}/create",{i})',
+    'var {i}=r.create({{baseURL:"https://api.example.com/v{n}",timeout:1e4}});{i}.put("{w}/"+{i})',
+    '{i}.open("GET","/api/{w}/data?x={n}",!0)',
+    '$.ajax({{url:"/rest/{w}/save",type:"PUT",data:{i}}})',
+    'this.http.delete("/api/{w}/"+{i}.id)',
+    'superagent.patch("/api/{w}/me").send({i})',
+    '{i}.query({{query:{i}}}),gql`query Get{W} {{ {w} {{ id }} }}`',
+    'JSON.stringify({{jsonrpc:"2.0",method:"{w}_get",params:[{i}],id:{n}}})',
+    '"/svc/v{n}/{w}/items"',
+)
+
+_WORDS = ("user", "order", "item", "cart", "account", "invoice", "product", "session",
+          "report", "search", "profile", "payment", "ticket", "audit", "metric")
+
+
+def _ident(rng: random.Random) -> str:
+    return "".join(rng.choice(_IDENT) for _ in range(rng.randint(1, 3)))
+
+
+def _filler(rng: random.Random) -> str:
+    """One minified statement with no endpoint in it."""
+    a, b, c = _ident(rng), _ident(rng), _ident(rng)
+    n = rng.randint(0, 9999)
+    return rng.choice((
+        f"function {a}({b},{c}){{return {b}&&{b}[{c}]!==void 0?{b}[{c}]:{n}}}",
+        f"var {a}={b}.prototype.{c}||function(){{}}",
+        f'{a}.exports={{default:{b},__esModule:!0,name:"{c}{n}"}}',
+        f"for(var {a}=0;{a}<{b}.length;{a}++){c}.push({b}[{a}]*{n})",
+        f'if("string"==typeof {a})throw new Error("Invalid {b}: "+{a})',
+        f"{a}=Object.assign({{}},{b},{{{c}:{n}}})",
+        f'{a}.addEventListener("click",function({b}){{{b}.preventDefault(),{c}({b}.target)}})',
+        f"{a}.then(function({b}){{return {b}.json()}}).catch({c})",
+    ))
+
+
+def bundle(size: int, seed: int = 0) -> str:
+    """A minified-looking webpack bundle of about ``size`` characters."""
+    rng = random.Random(seed)
+    parts: list[str] = []
+    total = 0
+    module = 0
+    while total < size:
+        body = []
+        for _ in range(rng.randint(10, 40)):
+            if rng.random() < 0.06:
+                w = rng.choice(_WORDS)
+                body.append(rng.choice(_CALLS).format(
+                    i=_ident(rng), w=w, W=w.title(), n=rng.randint(1, 9)))
+            else:
+                body.append(_filler(rng))
+        chunk = f"{module}:function(e,t,n){{\"use strict\";{';'.join(body)}}},"
+        parts.append(chunk)
+        total += len(chunk)
+        module += 1
+    return "(self.webpackChunk=self.webpackChunk||[]).push([[0],{" + "".join(parts) + "}]);"
+
+
+def synthetic_files() -> list[str]:
+    """Paths of the generated bundles, built on first use."""
+    out_dir = os.path.join(_GENERATED, f"v{CORPUS_VERSION}")
+    os.makedirs(out_dir, exist_ok=True)
+    paths = []
+    for mb in SIZES_MB:
+        path = os.path.join(out_dir, f"synthetic-{mb}mb.js")
+        if not os.path.exists(path):
+            with open(path, "w") as f:
+                f.write(bundle(mb * 1024 * 1024, seed=mb))
+        paths.append(path)
+    return paths
@@ -0,0 +1,272 @@
+from __future__ import annotations
+
+import argparse
+import hashlib
+import itertools
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+BENCH = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(BENCH)
+sys.path.insert(0, os.path.join(BENCH, "corpus"))
+
+from synthetic import bundle  # noqa: E402
+
+
+class Site:
+    """A deterministic site graph: page ``n`` links to ``fanout`` other pages
+    and loads ``scripts`` bundles drawn from a pool of ``bundles`` shared
+    ones, so later pages mostly reuse scripts already fetched."""
+
+    def __init__(self, pages=200, fanout=8, scripts=3, bundles=20, bundle_kb=200,
+                 latency_ms=20.0, jitter_ms=10.0, rate_429=0.0, seed=0):
+        self.pages = pages
+        self.fanout = fanout
+        self.scripts = scripts
+        self.bundles = bundles
+        self.bundle_kb = bundle_kb
+        self.latency = latency_ms / 1000
+        self.jitter = jitter_ms / 1000
+        self.rate_429 = rate_429
+        self.seed = seed
+        self._bodies: dict[int, bytes] = {}
+        self._lock = threading.Lock()
+        self._rng = random.Random(seed)
+        self._seen: set[str] = set()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.counts = {"pages": 0, "scripts": 0, "throttled": 0, "bytes": 0}
+            self._seen.clear()
+
+    def page(self, n: int) -> bytes:
+        rng = random.Random(self.seed * 1_000_003 + n)
+        links = "".join(f'<a href="/p/{rng.randrange(self.pages)}">x</a>' for _ in range(self.fanout))
+        scripts = "".join(f'<script src="/static/b{rng.randrange(self.bundles)}.js"></script>'
+                          for _ in range(self.scripts))
+        inline = f'<script>fetch("/api/pages/{n}/state")</script>'
+        return f"<!doctype html><html><head>{scripts}</head><body>{links}{inline}</body></html>".encode()
+
+    def script(self, k: int) -> bytes:
+        with self._lock:
+            body = self._bodies.get(k)
+        if body is None:
+            body = bundle(self.bundle_kb * 1024, seed=self.seed * 1_000_003 + k).encode()
+            with self._lock:
+                self._bodies[k] = body
+        return body
+
+    def throttled(self, path: str) -> bool:
+        """Whether to answer 429 to this request: the first request for a
+        fixed ``rate_429`` share of paths, picked by hash so runs agree."""
+        if self.rate_429 <= 0:
+            return False
+        with self._lock:
+            if path in self._seen:
+                return False
+            self._seen.add(path)
+        h = int.from_bytes(hashlib.blake2b(path.encode(), digest_size=4).digest(), "big")
+        return h / 2**32 < self.rate_429
+
+    def delay(self) -> float:
+        with self._lock:
+            j = self._rng.uniform(-self.jitter, self.jitter)
+        return max(0.0, self.latency + j)
+
+    def count(self, key: str, nbytes: int):
+        with self._lock:
+            self.counts[key] += 1
+            self.counts["bytes"] += nbytes
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out as separate writes; on a kept-alive connection
+    # Nagle would hold the body back until the client's delayed ACK.
+    disable_nagle_algorithm = True
+    site: Site
+
+    def do_GET(self):
+        site = self.site
+        time.sleep(site.delay())
+        path = self.path.split("?", 1)[0]
+        if site.throttled(path):
+            site.count("throttled", 0)
+            return self._send(429, b"", "text/plain", {"Retry-After": "1"})
+        if path == "/" or path.startswith("/p/"):
+            n = 0 if path == "/" else int(path[3:]) if path[3:].isdigit() else -1
+            if 0 <= n < site.pages:
+                body = site.page(n)
+                site.count("pages", len(body))
+                return self._send(200, body, "text/html; charset=utf-8")
+        elif path.startswith("/static/b") and path.endswith(".js"):
+            k = path[9:-3]
+            if k.isdigit() and int(k) < site.bundles:
+                body = site.script(int(k))
+                site.count("scripts", len(body))
+                return self._send(200, body, "application/javascript")
+        self._send(404, b"not found", "text/plain")
+
+    def _send(self, status: int, body: bytes, ctype: str, headers=None):
+        self.send_response(status)
+        self.send_header("Content-Type", ctype)
+        self.send_header("Content-Length", str(len(body)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def serve(site: Site, port: int = 0) -> ThreadingHTTPServer:
+    """Start serving ``site`` on 127.0.0.1 in a daemon thread."""
+    handler = type("Handler", (_Handler,), {"site": site})
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    server.daemon_threads = True
+    server.request_queue_size = 128
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def _peak_rss(who) -> int:
+    scale = 1 if sys.platform == "darwin" else 1024
+    return resource.getrusage(who).ru_maxrss * scale
+
+
+def _crawl(config: dict) -> dict:
+    """Run one crawl in this process and report its timings."""
+    sys.path.insert(0, ROOT)
+    from crawler import Crawler, AsyncCrawler
+
+    t0 = time.perf_counter()
+    first = []
+
+    def on_endpoints(eps):
+        if eps and not first:
+            first.append(time.perf_counter() - t0)
+
+    kwargs = dict(max_depth=config["max_depth"], max_pages=config["max_pages"],
+                  workers=config["workers"], cpu_workers=config["cpu_workers"],
+                  on_endpoints=on_endpoints)
+    if config["engine"] == "async":
+        crawler = AsyncCrawler(config["url"], concurrency=config["concurrency"], **kwargs)
+    else:
+        crawler = Crawler(config["url"], **kwargs)
+    endpoints = crawler.run()
+    return {
+        "seconds": time.perf_counter() - t0,
+        "first_endpoint_s": first[0] if first else None,
+        "endpoints": len(endpoints),
+        "peak_rss": _peak_rss(resource.RUSAGE_SELF),
+        "peak_rss_workers": _peak_rss(resource.RUSAGE_CHILDREN),
+    }
+
+
+def _run(config: dict) -> dict:
+    out = subprocess.run([sys.executable, __file__, "--child", json.dumps(config)],
+                         check=True, capture_output=True, text=True).stdout
+    return json.loads(out)
+
+
+def _ints(s: str) -> list[int]:
+    return [int(x) for x in s.split(",") if x]
+
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description="End-to-end crawl throughput against a local synthetic site.")
+    site = p.add_argument_group("site")
+    site.add_argument("--pages", type=int, default=200)
+    site.add_argument("--fanout", type=int, default=8, help="Links per page")
+    site.add_argument("--scripts", type=int, default=3, help="Script tags per page")
+    site.add_argument("--bundles", type=int, default=20, help="Distinct scripts across the site")
+    site.add_argument("--bundle-kb", type=int, default=200)
+    site.add_argument("--latency-ms", type=float, default=20.0)
+    site.add_argument("--jitter-ms", type=float, default=10.0)
+    site.add_argument("--rate-429", type=float, default=0.0,
+                      help="Share of paths whose first request is answered 429")
+    site.add_argument("--seed", type=int, default=0)
+    site.add_argument("--serve", type=int, metavar="PORT", default=None,
+                      help="Only serve the site on PORT, e.g. to point apipie at it by hand")
+    crawl = p.add_argument_group("crawl matrix (comma-separated values are all run)")
+    crawl.add_argument("--engine", default="sync,async")
+    crawl.add_argument("--workers", default="2,6,16")
+    crawl.add_argument("--concurrency", default="8", help="Used with the async engine only")
+    crawl.add_argument("--cpu-workers", default="0")
+    crawl.add_argument("--max-depth", type=int, default=10)
+    crawl.add_argument("--max-pages", type=int, default=None, help="Default: --pages")
+    p.add_argument("--json", metavar="FILE", help="Also write results as JSON")
+    p.add_argument("--child", help=argparse.SUPPRESS)
+    args = p.parse_args(argv)
+
+    if args.child:
+        print(json.dumps(_crawl(json.loads(args.child))))
+        return 0
+
+    site = Site(args.pages, args.fanout, args.scripts, args.bundles, args.bundle_kb,
+                args.latency_ms, args.jitter_ms, args.rate_429, args.seed)
+    if args.serve is not None:
+        server = serve(site, args.serve)
+        print(f"serving on http://127.0.0.1:{server.server_port}/ (Ctrl-C to stop)")
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            server.shutdown()
+        return 0
+
+    # Build the bundles up front so the first run does not pay for them.
+    for k in range(args.bundles):
+        site.script(k)
+    server = serve(site)
+    url = f"http://127.0.0.1:{server.server_port}/"
+
+    configs = []
+    for engine in args.engine.split(","):
+        for conc, workers, cpu in itertools.product(
+                _ints(args.concurrency) if engine == "async" else [0],
+                _ints(args.workers), _ints(args.cpu_workers)):
+            configs.append({"url": url, "engine": engine, "concurrency": conc, "workers": workers,
+                            "cpu_workers": cpu, "max_depth": args.max_depth,
+                            "max_pages": args.max_pages or args.pages})
+
+    print(f"{args.pages} pages, fan-out {args.fanout}, {args.scripts} scripts/page from "
+          f"{args.bundles} x {args.bundle_kb} KB, latency {args.latency_ms:g}±{args.jitter_ms:g} ms, "
+          f"429 rate {args.rate_429:g}")
+    print(f"{'engine':<6} {'conc':>4} {'workers':>7} {'cpu':>3}  {'pages/s':>8} {'scripts/s':>9} "
+          f"{'first ep s':>10} {'peak MiB':>8} {'endpoints':>9} {'429s':>5}")
+    results = []
+    for config in configs:
+        site.reset()
+        r = _run(config)
+        r.update(site.counts)
+        r.update({k: config[k] for k in ("engine", "concurrency", "workers", "cpu_workers")})
+        r["pages_s"] = r["pages"] / r["seconds"]
+        r["scripts_s"] = r["scripts"] / r["seconds"]
+        results.append(r)
+        first = f"{r['first_endpoint_s']:10.3f}" if r["first_endpoint_s"] is not None else f"{'-':>10}"
+        conc = config["concurrency"] or "-"
+        print(f"{config['engine']:<6} {conc:>4} {config['workers']:>7} {config['cpu_workers']:>3}  "
+              f"{r['pages_s']:8.1f} {r['scripts_s']:9.1f} {first} {r['peak_rss'] / 2**20:8.1f} "
+              f"{r['endpoints']:9} {r['throttled']:5}")
+    server.shutdown()
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"site": {k: v for k, v in vars(args).items()
+                                if k in ("pages", "fanout", "scripts", "bundles", "bundle_kb",
+                                         "latency_ms", "jitter_ms", "rate_429", "seed")},
+                       "results": results}, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
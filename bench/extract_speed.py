@@ -0,0 +1,158 @@
+from __future__ import annotations
+
+import argparse
+import glob
+import json
+import os
+import platform
+import sys
+import time
+
+BENCH = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH))
+sys.path.insert(0, os.path.join(BENCH, "corpus"))
+
+from extractors import _ANCHORS, _JS_EXTRACTORS, extract_from_js  # noqa: E402
+from extractors.scan import Scan  # noqa: E402
+from synthetic import CORPUS_VERSION, synthetic_files  # noqa: E402
+
+BASELINE = os.path.join(BENCH, "baseline.json")
+FIXTURES = os.path.join(BENCH, "corpus", "fixtures")
+
+
+def _best(fn, repeat: int) -> tuple[float, object]:
+    """Best per-call time over ``repeat`` batches, each batch running ``fn``
+    enough times to take at least 50 ms so small inputs time stably."""
+    t = time.perf_counter()
+    out = fn()
+    once = time.perf_counter() - t
+    number = max(1, int(0.05 / once) if once > 0 else 1000)
+    best = once if number == 1 else float("inf")
+    for _ in range(repeat):
+        t = time.perf_counter()
+        for _ in range(number):
+            fn()
+        best = min(best, (time.perf_counter() - t) / number)
+    return best, out
+
+
+def _calibrate() -> float:
+    """Seconds for a fixed regex-and-loop workload, used to scale baseline
+    throughput to the speed of the machine running the comparison."""
+    import re
+    text = "var a=b.get('/x/y',c);function d(e){return e+1}" * 20000
+    pattern = re.compile(r"""\.get\(\s*['"]([^'"]+)['"]""")
+
+    def work():
+        n = sum(1 for _ in pattern.finditer(text))
+        return n + sum(len(w) for w in text[:200000].split(";"))
+
+    return _best(work, 5)[0]
+
+
+def measure(js: str, repeat: int) -> dict[str, dict]:
+    """Best-of-``repeat`` time and hit count for the shared scan, each
+    extractor on that scan, and ``extract_from_js`` end to end."""
+    rows = {}
+    dt, scan = _best(lambda: Scan(js, _ANCHORS), repeat)
+    rows["scan"] = {"seconds": dt, "hits": 0}
+    for mod in _JS_EXTRACTORS:
+        name = mod.__name__.rsplit(".", 1)[-1]
+        dt, hits = _best(lambda: mod.extract(js, scan), repeat)
+        rows[name] = {"seconds": dt, "hits": len(hits)}
+    dt, hits = _best(lambda: extract_from_js(js), repeat)
+    rows["extract_from_js"] = {"seconds": dt, "hits": len(hits)}
+    mb = len(js.encode("utf-8")) / 1e6
+    for row in rows.values():
+        s = max(row["seconds"], 1e-9)
+        row["mb_s"] = round(mb / s, 2)
+        row["hits_s"] = round(row["hits"] / s, 1)
+        row["seconds"] = round(row["seconds"], 6)
+    return rows
+
+
+def corpus(include_large: bool) -> list[str]:
+    files = sorted(glob.glob(os.path.join(FIXTURES, "*.js")))
+    synth = synthetic_files()
+    return files + (synth if include_large else synth[:1])
+
+
+def compare(results: dict, calibration: float, baseline: dict, tolerance: float,
+            min_time: float) -> list[str]:
+    """Regressions against ``baseline``: a changed hit count, or throughput
+    down by more than ``tolerance`` once the baseline is scaled by the two
+    machines' calibration times. Rows whose baseline call took under
+    ``min_time`` seconds are too noisy to compare throughput on."""
+    problems = []
+    if baseline.get("corpus_version") != CORPUS_VERSION:
+        return [f"baseline is for corpus v{baseline.get('corpus_version')}, not v{CORPUS_VERSION}"]
+    scale = baseline["calibration_s"] / calibration
+    for name, rows in results.items():
+        old_rows = baseline["results"].get(name, {})
+        for row, new in rows.items():
+            old = old_rows.get(row)
+            if old is None:
+                continue
+            if new["hits"] != old["hits"]:
+                problems.append(f"{name} {row}: hits {old['hits']} -> {new['hits']}")
+            expected = old["mb_s"] * scale
+            if old["seconds"] >= min_time and new["mb_s"] < expected * (1 - tolerance):
+                problems.append(f"{name} {row}: expected ~{expected:.1f}, got {new['mb_s']} MB/s")
+    return problems
+
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description="Throughput of extract_from_js and each extractor.")
+    p.add_argument("--repeat", type=int, default=3, help="Runs per measurement; the best is kept")
+    p.add_argument("--quick", action="store_true", help="Skip the 5 and 20 MB bundles")
+    p.add_argument("--save-baseline", action="store_true", help=f"Write results to {BASELINE}")
+    p.add_argument("--tolerance", type=float, default=0.25,
+                   help="Allowed throughput drop against the baseline (default: 0.25)")
+    p.add_argument("--min-time", type=float, default=0.002,
+                   help="Only compare throughput of rows whose baseline call took this many seconds")
+    p.add_argument("--json", metavar="FILE", help="Also write results as JSON")
+    args = p.parse_args(argv)
+
+    calibration = _calibrate()
+    results = {}
+    for path in corpus(not args.quick):
+        with open(path, encoding="utf-8") as f:
+            js = f.read()
+        name = os.path.basename(path)
+        results[name] = rows = measure(js, args.repeat)
+        print(f"\n{name}  ({len(js) / 1e6:.2f} MB)")
+        print(f"  {'':16} {'MB/s':>9} {'hits':>7} {'hits/s':>10}")
+        for row, r in rows.items():
+            print(f"  {row:16} {r['mb_s']:9.1f} {r['hits']:7} {r['hits_s']:10.0f}")
+
+    doc = {
+        "corpus_version": CORPUS_VERSION,
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "calibration_s": round(calibration, 6),
+        "results": results,
+    }
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(doc, f, indent=2)
+    if args.save_baseline:
+        with open(BASELINE, "w") as f:
+            json.dump(doc, f, indent=2)
+            f.write("\n")
+        print(f"\nbaseline written to {BASELINE}")
+        return 0
+    if not os.path.exists(BASELINE):
+        print("\nno baseline stored; run with --save-baseline")
+        return 0
+    with open(BASELINE) as f:
+        problems = compare(results, calibration, json.load(f), args.tolerance, args.min_time)
+    print()
+    for line in problems:
+        print(f"REGRESSION  {line}")
+    if not problems:
+        print("no regressions against baseline")
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
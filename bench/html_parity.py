@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import sys
+import time
+
+BENCH = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH))
+
+from extractors.html import BACKENDS  # noqa: E402
+
+_WORDS = ("users", "orders", "cart", "search", "login", "v1", "v2", "items", "profile", "export")
+
+
+def _path(rng: random.Random) -> str:
+    return "/" + "/".join(rng.choice(_WORDS) for _ in range(rng.randint(1, 3)))
+
+
+def _element(rng: random.Random) -> str:
+    kind = rng.randrange(9)
+    if kind == 0:
+        return f'<a href="{_path(rng)}?q={rng.randrange(99)}#top">link</a>'
+    if kind == 1:
+        return f'<script src="/static/{rng.choice(_WORDS)}.js"></script>'
+    if kind == 2:
+        body = rng.choice((f'fetch("/api{_path(rng)}")', "<!-- x -->var a = 1 < 2;", " ",
+                           "<![CDATA[axios.get('/api/x')]]>", "if (a && b) { c('</div>') }"))
+        return f"<script>{body}</script>"
+    if kind == 3:
+        method = rng.choice(("post", "GET", "", "Put"))
+        attr = f' method="{method}"' if method else ""
+        return f'<form action="/api{_path(rng)}"{attr}><input name="q"></form>'
+    if kind == 4:
+        attr = rng.choice(("data-url", "data-endpoint", "DATA-URL"))
+        return f'<div {attr}="/api{_path(rng)}"><span>text</span></div>'
+    if kind == 5:
+        return "<!-- comment <a href='/hidden'>x</a> -->"
+    if kind == 6:
+        return "<p>unclosed <b>bold <i>italic</p>"
+    if kind == 7:
+        return f'<table><tr><td><a href="{_path(rng)}">cell</a></td></table>'
+    return "&amp; &nbsp; text &lt;a&gt;"
+
+
+def _body(rng: random.Random, n: int) -> str:
+    return "".join(_element(rng) for _ in range(n))
+
+
+def documents(n: int, seed: int = 0):
+    """``n`` generated pages, a third of them with content past the root
+    element: elements after </html>, a second document, or stray text
+    before <html>."""
+    rng = random.Random(seed)
+    for i in range(n):
+        page = f"<!DOCTYPE html><html><head><title>t</title></head><body>{_body(rng, rng.randint(1, 40))}</body></html>"
+        shape = i % 6
+        if shape == 1:
+            page += _body(rng, rng.randint(1, 5))
+        elif shape == 3:
+            page += f"<html><body>{_body(rng, rng.randint(1, 10))}</body></html>"
+        elif shape == 5:
+            page = "junk text</html>" + page
+        yield page
+
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description="Check the lxml HTML backend against BeautifulSoup.")
+    p.add_argument("--pages", type=int, default=3000, help="Generated pages (default: 3000)")
+    p.add_argument("--seed", type=int, default=0)
+    args = p.parse_args(argv)
+
+    if "lxml" not in BACKENDS:
+        print("lxml is not installed, nothing to compare")
+        return 0
+    lxml, bs4 = BACKENDS["lxml"], BACKENDS["bs4"]
+    mismatches = 0
+    times = {"lxml": 0.0, "bs4": 0.0}
+    for n, page in enumerate(documents(args.pages, args.seed)):
+        t = time.perf_counter()
+        a = lxml(page)
+        times["lxml"] += time.perf_counter() - t
+        t = time.perf_counter()
+        b = bs4(page)
+        times["bs4"] += time.perf_counter() - t
+        if a != b:
+            mismatches += 1
+            if mismatches <= 5:
+                print(f"page {n} differs:\n  lxml {a}\n  bs4  {b}\n  {page[:300]}")
+    print(f"{args.pages} pages, {mismatches} mismatch(es); "
+          f"lxml {times['lxml']:.2f}s, bs4 {times['bs4']:.2f}s")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import time
+
+BENCH = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH))
+sys.path.insert(0, os.path.join(BENCH, "corpus"))
+
+from crawler import _extract_js  # noqa: E402
+from pathological import CASES  # noqa: E402
+
+
+def _time(js: str) -> float:
+    t = time.perf_counter()
+    _extract_js(js)
+    return time.perf_counter() - t
+
+
+def main(argv=None):
+    p = argparse.ArgumentParser(
+        description="Check that extraction time grows linearly on inputs built to make regexes backtrack.")
+    p.add_argument("--size", type=int, default=2000, help="Repeat count of the smaller input")
+    p.add_argument("--factor", type=int, default=4, help="How much larger the second input is")
+    p.add_argument("--max-growth", type=float, default=None,
+                   help="Fail when time grows by more than this (default: 2 x --factor)")
+    p.add_argument("--only", help="Run just this case")
+    args = p.parse_args(argv)
+    limit = args.max_growth or 2 * args.factor
+
+    failed = []
+    print(f"{'case':<24} {'small ms':>9} {'large ms':>9} {'growth':>7}")
+    for name, build in CASES.items():
+        if args.only and name != args.only:
+            continue
+        small, large = build(args.size), build(args.size * args.factor)
+        t_small = min(_time(small) for _ in range(3))
+        t_large = min(_time(large) for _ in range(3))
+        # Below a millisecond the ratio is mostly timer noise.
+        growth = t_large / max(t_small, 1e-3)
+        flag = "  SUPERLINEAR" if growth > limit else ""
+        print(f"{name:<24} {t_small * 1e3:9.1f} {t_large * 1e3:9.1f} {growth:7.1f}{flag}")
+        if flag:
+            failed.append(name)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import argparse
+import gc
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+BENCH = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH))
+
+from seen import SeenSet  # noqa: E402
+
+_WORDS = ("blue", "cotton", "shirt", "men", "women", "kids", "sale", "summer", "leather", "boot",
+          "slim", "fit", "classic", "organic", "wool", "running", "shoe", "bag", "black", "gift")
+
+
+def keys(n: int, seed: int = 0):
+    """``n`` distinct crawl keys shaped like a large shop's product, listing
+    and filter URLs."""
+    rng = random.Random(seed)
+    for i in range(n):
+        slug = "-".join(rng.choice(_WORDS) for _ in range(rng.randint(2, 6)))
+        kind = rng.random()
+        if kind < 0.6:
+            yield f"https://www.shop.example.com/p/{slug}-{i}"
+        elif kind < 0.9:
+            yield f"https://www.shop.example.com/c/{rng.choice(_WORDS)}/{slug}/page-{i}"
+        else:
+            yield f"https://www.shop.example.com/c/{rng.choice(_WORDS)}/f/{slug}/{i}.html"
+
+
+def _memory(make, n: int, seed: int) -> int:
+    """Bytes still allocated after adding ``n`` keys, made one at a time as
+    the crawler makes them, so a set[str] is charged for the strings it keeps."""
+    gc.collect()
+    tracemalloc.start()
+    s = make()
+    for k in keys(n, seed):
+        s.add(k)
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del s
+    return size
+
+
+def _timings(make, n: int, seed: int) -> dict[str, float]:
+    """Nanoseconds per add of a new key, per lookup of a member and per
+    lookup of a non-member."""
+    present = list(keys(n, seed))
+    absent = list(keys(min(n, 200_000), seed + 1))
+    s = make()
+    t = time.perf_counter()
+    for k in present:
+        s.add(k)
+    add = (time.perf_counter() - t) / n
+    sample = present[:: max(1, n // 200_000)]
+    t = time.perf_counter()
+    for k in sample:
+        k in s
+    hit = (time.perf_counter() - t) / len(sample)
+    t = time.perf_counter()
+    for k in absent:
+        k in s
+    miss = (time.perf_counter() - t) / len(absent)
+    return {"add_ns": add * 1e9, "hit_ns": hit * 1e9, "miss_ns": miss * 1e9}
+
+
+IMPLS = {"set[str]": set, "SeenSet": SeenSet}
+
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description="Memory and lookup cost of the crawl seen-set.")
+    p.add_argument("--sizes", default="10000,100000,1000000",
+                   help="Comma-separated member counts (default: 10000,100000,1000000)")
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("--json", metavar="FILE", help="Also write results as JSON")
+    args = p.parse_args(argv)
+
+    results = []
+    print(f"{'impl':<9} {'keys':>9} {'MiB':>8} {'B/key':>7} {'add ns':>8} {'hit ns':>8} {'miss ns':>8}")
+    for n in (int(x) for x in args.sizes.split(",") if x):
+        for name, make in IMPLS.items():
+            r = {"impl": name, "keys": n, "bytes": _memory(make, n, args.seed)}
+            r.update(_timings(make, n, args.seed))
+            results.append(r)
+            print(f"{name:<9} {n:>9} {r['bytes'] / 2**20:8.1f} {r['bytes'] / n:7.1f} "
+                  f"{r['add_ns']:8.0f} {r['hit_ns']:8.0f} {r['miss_ns']:8.0f}")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import tarfile
+import tempfile
+import io
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _rss() -> int:
+    """Current resident set size in bytes (peak RSS where /proc is missing)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        scale = 1 if sys.platform == "darwin" else 1024
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
+
+
+def _workload(models_dir: str, endpoints: int, pages: int, hits: int, seed: int) -> dict:
+    """Register ``hits`` hits per endpoint from random pages, building each
+    source and parameter string afresh as a crawl would."""
+    sys.path.insert(0, models_dir)
+    from models import EndpointStore, Hit
+
+    rng = random.Random(seed)
+    before = _rss()
+    store = EndpointStore()
+    hit = Hit(url="", method="GET")
+    for _ in range(hits):
+        for n in range(endpoints):
+            page = rng.randrange(pages)
+            source = "https://app.example.com/section/%d/page-%d.html" % (page % 50, page)
+            url = "https://app.example.com/api/v1/resource%d/items" % n
+            params = {"id": [str(rng.randrange(50))], "page": [str(page % 7)]}
+            store.add(url, hit=hit, source=source, params=params)
+    return {"endpoints": len(store), "rss_bytes": _rss() - before}
+
+
+def _export(rev: str, into: str):
+    """Extract models.py as of git revision ``rev`` into ``into``."""
+    tar = subprocess.run(["git", "-C", ROOT, "archive", rev, "models.py"],
+                         check=True, capture_output=True).stdout
+    tarfile.open(fileobj=io.BytesIO(tar)).extractall(into)
+
+
+def _run(models_dir: str, args) -> dict:
+    out = subprocess.run(
+        [sys.executable, __file__, "--child", models_dir,
+         "--endpoints", str(args.endpoints), "--pages", str(args.pages),
+         "--hits", str(args.hits), "--seed", str(args.seed)],
+        check=True, capture_output=True, text=True,
+    ).stdout
+    return json.loads(out)
+
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description="RSS of an EndpointStore after a synthetic crawl.")
+    p.add_argument("--endpoints", type=int, default=50_000)
+    p.add_argument("--pages", type=int, default=2_000, help="Distinct source pages")
+    p.add_argument("--hits", type=int, default=20, help="Hits per endpoint")
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("--baseline", metavar="REV", default=None,
+                   help="Also measure models.py from this git revision, e.g. HEAD~1")
+    p.add_argument("--child", metavar="DIR", help=argparse.SUPPRESS)
+    args = p.parse_args(argv)
+
+    if args.child:
+        print(json.dumps(_workload(args.child, args.endpoints, args.pages, args.hits, args.seed)))
+        return
+
+    runs = [("working tree", ROOT)]
+    tmp = None
+    if args.baseline:
+        tmp = tempfile.TemporaryDirectory()
+        _export(args.baseline, tmp.name)
+        runs.insert(0, (args.baseline, tmp.name))
+    print(f"{args.endpoints} endpoints x {args.hits} hits from {args.pages} pages")
+    results = []
+    for label, path in runs:
+        r = _run(path, args)
+        results.append(r)
+        print(f"  {label:<14} {r['rss_bytes'] / 2**20:8.1f} MiB")
+    if len(results) == 2 and results[0]["rss_bytes"]:
+        drop = 1 - results[1]["rss_bytes"] / results[0]["rss_bytes"]
+        print(f"  {'change':<14} {-drop:+8.1%}")
+    if tmp is not None:
+        tmp.cleanup()
+
+
+if __name__ == "__main__":
+    main()
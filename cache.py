@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    url           TEXT PRIMARY KEY,
+    etag          TEXT,
+    last_modified TEXT,
+    encoding      TEXT,
+    body          BLOB NOT NULL,
+    size          INTEGER NOT NULL,
+    last_used     REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS responses_lru ON responses (last_used);
+"""
+
+
+@dataclass
+class Validators:
+    etag: str | None
+    last_modified: str | None
+
+
+class ResponseCache:
+    """Response bodies and their validators, kept across runs in one SQLite
+    file under ``path`` and capped at ``max_bytes`` of body data, evicting the
+    least recently used entries first. Safe to share between threads."""
+
+    def __init__(self, path: str, max_bytes: int):
+        os.makedirs(path, exist_ok=True)
+        self._max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(os.path.join(path, "responses.sqlite3"),
+                                   isolation_level=None, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(_SCHEMA)
+        self._size = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        self.revalidated = 0
+        self.stored = 0
+
+    def validators(self, url: str) -> Validators | None:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT etag, last_modified FROM responses WHERE url = ?", (url,)
+            ).fetchone()
+        return Validators(*row) if row else None
+
+    def body(self, url: str) -> tuple[bytes, str] | None:
+        """Return (body, encoding) for a 304 response and mark it recently used."""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT body, encoding FROM responses WHERE url = ?", (url,)
+            ).fetchone()
+            if row is None:
+                return None
+            self._db.execute("UPDATE responses SET last_used = ? WHERE url = ?", (time.time(), url))
+            self.revalidated += 1
+        return bytes(row[0]), row[1]
+
+    def store(self, url: str, body: bytes, encoding: str,
+              etag: str | None, last_modified: str | None):
+        if len(body) > self._max_bytes:
+            return
+        with self._lock:
+            old = self._db.execute("SELECT size FROM responses WHERE url = ?", (url,)).fetchone()
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (url, etag, last_modified, encoding, body, len(body), time.time()),
+            )
+            self._size += len(body) - (old[0] if old else 0)
+            self.stored += 1
+            self._evict()
+
+    def _evict(self):
+        while self._size > self._max_bytes:
+            rows = self._db.execute(
+                "SELECT url, size FROM responses ORDER BY last_used LIMIT 64"
+            ).fetchall()
+            if not rows:
+                break
+            for url, size in rows:
+                self._db.execute("DELETE FROM responses WHERE url = ?", (url,))
+                self._size -= size
+                if self._size <= self._max_bytes:
+                    break
+
+    def close(self):
+        with self._lock:
+            self._db.close()
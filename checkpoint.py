@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+import base64
+import gzip
+import io
+import json
+import os
+from dataclasses import dataclass, field
+
+from models import Endpoint, EndpointStore
+from seen import SeenSet
+
+_VERSION = 2
+
+
+@dataclass
+class Checkpoint:
+    """An interrupted crawl: the pages still to visit as (url, depth), the
+    crawl keys of every page found and the script URLs already fetched (both
+    hashed, see seen.py), and the endpoints found on the pages visited so far."""
+    target: str = ""
+    queue: list[tuple[str, int]] = field(default_factory=list)
+    seen_keys: SeenSet = field(default_factory=SeenSet)
+    seen_scripts: SeenSet = field(default_factory=SeenSet)
+    endpoints: list[list] = field(default_factory=list)
+
+    def restore(self, store: EndpointStore):
+        """Put the saved endpoints back into an empty ``store``."""
+        for url, kind, methods, params, sources, gql_ops, rpc_methods, hits in self.endpoints:
+            ep = Endpoint(url, kind)
+            ep.methods.update(methods)
+            ep.add_params(params, store.max_param_values)
+            ep.sources.update(sources)
+            if gql_ops:
+                ep.gql_ops = {tuple(op) for op in gql_ops}
+            if rpc_methods:
+                ep.rpc_methods = set(rpc_methods)
+            ep.hits = hits
+            store._map[ep.url] = ep
+
+
+def load(path: str, target: str) -> Checkpoint | None:
+    """Read the checkpoint at ``path``; None if there is none. Raises
+    ValueError if it was written for another target."""
+    if not os.path.exists(path):
+        return None
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        raw = json.load(f)
+    if raw.get("version") != _VERSION:
+        return None
+    if raw["target"] != target:
+        raise ValueError(f"checkpoint {path} belongs to {raw['target']}, not {target}")
+    return Checkpoint(
+        target=raw["target"],
+        queue=[(url, depth) for url, depth in raw["queue"]],
+        seen_keys=SeenSet.from_bytes(base64.b64decode(raw["seen_keys"])),
+        seen_scripts=SeenSet.from_bytes(base64.b64decode(raw["seen_scripts"])),
+        endpoints=raw["endpoints"],
+    )
+
+
+def save(path: str, crawler, queue, seen_keys: SeenSet):
+    """Write the crawl's progress so far, replacing ``path`` atomically (and
+    only once the new file is on disk) so a crash mid-write leaves the
+    previous checkpoint intact."""
+    raw = {
+        "version": _VERSION,
+        "target": crawler.base_url,
+        "queue": list(queue),
+        "seen_keys": base64.b64encode(seen_keys.to_bytes()).decode(),
+        "seen_scripts": base64.b64encode(crawler._seen_scripts.to_bytes()).decode(),
+        "endpoints": [
+            [ep.url, ep.kind, sorted(ep.methods), ep.params, sorted(ep.sources),
+             sorted(ep.gql_ops), sorted(ep.rpc_methods), ep.hits]
+            for ep in crawler.store._map.values()
+        ],
+    }
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        with io.TextIOWrapper(gzip.GzipFile(fileobj=f, mode="wb", compresslevel=6),
+                              encoding="utf-8") as text:
+            json.dump(raw, text, separators=(",", ":"))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
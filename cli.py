@@ -1,26 +1,50 @@
 from __future__ import annotations
 
 import argparse
+import os
+import signal
+import sqlite3
 import sys
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 from urllib.parse import urlparse
 
 from color import (
     print_banner, bold, dim, green, bright_green, yellow, red, cyan, white,
     method_tag, kind_tag, url_str, rpad,
 )
-from crawler import Crawler
-from reporter import markdown, json_report
-from client import UA_PRESETS
+from crawler import Crawler, AsyncCrawler, Shared, init_worker
+from reporter import (
+    write_markdown, write_json, endpoint_record, NdjsonWriter, diff_markdown, diff_json,
+)
+from client import CONNECT_TIMEOUT, READ_TIMEOUT, UA_PRESETS, HttpClient
+from cache import ResponseCache
+from frontier import Frontier
+import profiling
+from fingerprints import DEFAULT_DB, Fingerprints
+from extractors import HTML_BACKENDS
+import checkpoint
+import rescan
 
 
 def _build_parser() -> argparse.ArgumentParser:
     p = argparse.ArgumentParser(prog="apipie", description="API endpoint discovery.")
-    p.add_argument("--url", required=True)
-    p.add_argument("--output", "-o", default=None, help="Output file (default: <domain>_results.md)")
+    target = p.add_mutually_exclusive_group(required=True)
+    target.add_argument("--url")
+    target.add_argument("--targets-file", metavar="FILE",
+                        help="Crawl every URL in FILE (one per line, # comments) in this process, "
+                             "sharing connections and script analyses, one report per target")
+    p.add_argument("--output", "-o", default=None,
+                   help="Output file (default: <domain>_results.md); with --targets-file, the "
+                        "directory reports are written to (default: .)")
+    p.add_argument("--parallel", type=int, default=4,
+                   help="Targets crawled at once with --targets-file; they share the --workers "
+                        "script fetchers and --cpu-workers processes (default: 4)")
     p.add_argument("--max-depth", type=int, default=5)
     p.add_argument("--max-pages", type=int, default=300,
                    help="Max pages to crawl (default: 300)")
-    p.add_argument("--format", choices=["md", "json"], default="md")
+    p.add_argument("--format", choices=["md", "json", "ndjson"], default="md",
+                   help="ndjson writes one record per line as endpoints are found")
     p.add_argument("--header", "-H", action="append", default=[],
                    help="Extra header, e.g. -H 'Cookie: session=abc'")
     p.add_argument("--user-agent", default=None,
@@ -28,9 +52,68 @@ def _build_parser() -> argparse.ArgumentParser:
     p.add_argument("--ua", choices=list(UA_PRESETS), default=None, metavar="PRESET",
                    help="UA preset: " + ", ".join(UA_PRESETS))
     p.add_argument("--rate-limit", type=float, default=0.0,
-                   help="Min seconds between requests")
+                   help="Min seconds between requests to the same host")
+    p.add_argument("--connect-timeout", type=float, default=CONNECT_TIMEOUT,
+                   help=f"Seconds to wait for a connection (default: {CONNECT_TIMEOUT})")
+    p.add_argument("--read-timeout", type=float, default=READ_TIMEOUT,
+                   help=f"Seconds to wait between bytes of a response (default: {READ_TIMEOUT})")
+    p.add_argument("--no-adapt", action="store_true",
+                   help="Keep per-host concurrency at its maximum instead of halving it on 429/503 "
+                        "and growing it while latency is healthy")
     p.add_argument("--workers", type=int, default=6,
                    help="Concurrent JS fetchers")
+    p.add_argument("--max-inflight", type=int, default=None,
+                   help="Max JS bodies downloading or awaiting extraction at once (default: --workers)")
+    p.add_argument("--engine", choices=["sync", "async"], default="sync",
+                   help="Crawl engine: sync fetches one page at a time, async keeps several in flight")
+    p.add_argument("--concurrency", type=int, default=8,
+                   help="Page fetches in flight with --engine async (default: 8)")
+    p.add_argument("--prioritize", action="store_true",
+                   help="Visit the pages likeliest to add endpoints or scripts first (API-looking paths, "
+                        "links from productive pages, path words that paid off) instead of breadth-first")
+    p.add_argument("--min-yield", type=float, default=0.0, metavar="RATE",
+                   help="Stop once the last --yield-window pages found fewer than RATE new endpoints "
+                        "per page on average (default: 0, off)")
+    p.add_argument("--yield-window", type=int, default=50, metavar="PAGES",
+                   help="Pages averaged for --min-yield (default: 50)")
+    p.add_argument("--cluster-samples", type=int, default=0, metavar="N",
+                   help="Group pages by URL template (numeric IDs, UUIDs, hashes, slugs) and stop "
+                        "visiting a template once N of its pages in a row loaded the same scripts and "
+                        "found no new endpoints (default: 0, off)")
+    p.add_argument("--max-param-values", type=int, default=20,
+                   help="Distinct sample values kept per query parameter (default: 20)")
+    p.add_argument("--html-backend", choices=["auto", *HTML_BACKENDS], default="auto",
+                   help="HTML parser: lxml walks the tree once, bs4 is the fallback (default: lxml if installed)")
+    p.add_argument("--cpu-workers", type=int, default=0,
+                   help="Processes for HTML parsing and JS extraction (default: 0, in the main process)")
+    p.add_argument("--js-budget", type=float, default=30.0,
+                   help="Max seconds of extraction per script; slower scripts keep partial results "
+                        "and are listed (default: 30, 0 for no limit)")
+    p.add_argument("--fingerprints", default=DEFAULT_DB,
+                   help="Known-library fingerprint database (default: bundled fingerprints.json)")
+    p.add_argument("--no-skip-libs", action="store_true",
+                   help="Extract known library bundles instead of skipping them")
+    p.add_argument("--cache-dir", default=None,
+                   help="Keep responses here across runs and revalidate them with ETag/Last-Modified")
+    p.add_argument("--cache-size", type=int, default=256,
+                   help="Max MB of cached bodies, least recently used evicted first (default: 256)")
+    p.add_argument("--state", default=None,
+                   help="Rescan state file: reuse analyses of unchanged assets from the last run, "
+                        "write a diff against its report, then update it")
+    p.add_argument("--frontier", default=None, metavar="FILE",
+                   help="Keep the crawl frontier in this SQLite file. Processes given the same file "
+                        "share the crawl, each reporting every page completed so far")
+    p.add_argument("--checkpoint", default=None, metavar="FILE",
+                   help="Save crawl progress (queue, seen pages and scripts, endpoints) to FILE "
+                        "periodically and when the crawl ends or is interrupted")
+    p.add_argument("--checkpoint-every", type=float, default=60.0, metavar="SECONDS",
+                   help="Seconds between checkpoints (default: 60)")
+    p.add_argument("--resume", action="store_true",
+                   help="Continue the crawl saved in --checkpoint instead of starting over")
+    p.add_argument("--profile", action="store_true",
+                   help="Print wall/CPU time and bytes per stage (fetch, parse, each extractor, ...)")
+    p.add_argument("--profile-json", default=None, metavar="FILE",
+                   help="Also write the profile as JSON (implies --profile)")
     p.add_argument("--verbose", "-v", action="store_true")
     p.add_argument("--no-color", action="store_true", help="Disable colored output")
     return p
@@ -48,48 +131,346 @@ def _parse_headers(raw: list[str]) -> dict[str, str]:
 
 def _default_output(url: str, fmt: str) -> str:
     domain = urlparse(url).netloc.replace(":", "_").replace(".", "_")
-    ext = "json" if fmt == "json" else "md"
-    return f"{domain}_results.{ext}"
+    return f"{domain}_results.{fmt}"
 
 
 def _info(label: str, value: str):
     print(f"  {dim(label + ':')}  {white(value)}")
 
 
+def _save_state(args, crawler, state, endpoints, url: str, output: str):
+    records = [endpoint_record(ep) for ep in endpoints]
+    if state is not None:
+        new, changed, same = rescan.changed_assets(state, crawler.assets)
+        print(f"  {dim('rescan:')} {new} new, {changed} changed, {same} unchanged asset(s); "
+              f"{crawler.analysed} body(ies) analysed")
+        d = rescan.diff(state.report, records)
+        as_json = args.format != "md"
+        path = os.path.splitext(output)[0] + "_diff." + ("json" if as_json else "md")
+        with open(path, "w") as f:
+            f.write(diff_json(d) if as_json else diff_markdown(d, url))
+        counts = f"added={len(d['added'])} removed={len(d['removed'])} changed={len(d['changed'])}"
+        print(f"  {bright_green('+')}  {dim('wrote')} {white(path)}  {dim(counts)}")
+    rescan.save(args.state, crawler, records)
+
+
+def _print_profile(prof, path: str | None):
+    print("\n" + dim("  " + "─" * 52))
+    print(f"  {cyan(bold('Profile'))}  {dim('wall/cpu summed over threads and workers')}\n")
+    for line in prof.table().splitlines():
+        print("  " + line)
+    print(dim("  " + "─" * 52) + "\n")
+    if path:
+        with open(path, "w") as f:
+            f.write(prof.to_json())
+        print(f"  {bright_green('+')}  {dim('wrote')} {white(path)}\n")
+
+
+def _handle_signals(stop: threading.Event):
+    """Make the first SIGINT or SIGTERM stop the crawl after the page(s) in
+    progress, keeping what was found for the report; a second one aborts."""
+    def handler(signum, frame):
+        if stop.is_set():
+            raise KeyboardInterrupt
+        stop.set()
+        print(f"\n  {yellow('!')}  {white('stopping after the current page, writing a partial report')}"
+              f"  {dim('(again to abort)')}", file=sys.stderr)
+
+    signal.signal(signal.SIGINT, handler)
+    signal.signal(signal.SIGTERM, handler)
+
+
+def _read_targets(path: str) -> list[str]:
+    """URLs listed in ``path``, one per line; blank lines, ``#`` comments and
+    repeats are skipped."""
+    targets = []
+    with open(path) as f:
+        for line in f:
+            line = line.split("#", 1)[0].strip()
+            if line:
+                targets.append(line if "://" in line else f"https://{line}")
+    return list(dict.fromkeys(targets))
+
+
+def _engine(args):
+    if args.engine == "async":
+        return AsyncCrawler, {"concurrency": args.concurrency}
+    return Crawler, {}
+
+
+def _crawl_kwargs(args, headers: dict[str, str], ua: str | None, cache) -> dict:
+    return dict(
+        max_depth=args.max_depth,
+        max_pages=args.max_pages,
+        headers=headers,
+        rate_limit=args.rate_limit,
+        workers=args.workers,
+        max_inflight=args.max_inflight,
+        verbose=args.verbose,
+        user_agent=ua,
+        cache=cache,
+        cpu_workers=args.cpu_workers,
+        html_backend=args.html_backend,
+        max_param_values=args.max_param_values,
+        js_budget=args.js_budget or None,
+        adaptive=not args.no_adapt,
+        connect_timeout=args.connect_timeout,
+        read_timeout=args.read_timeout,
+        prioritize=args.prioritize,
+        min_yield=args.min_yield,
+        yield_window=args.yield_window,
+        cluster_samples=args.cluster_samples,
+        libraries=None if args.no_skip_libs else Fingerprints.load(args.fingerprints),
+    )
+
+
+def _write_report(endpoints, url: str, output: str, fmt: str, crawler):
+    # ndjson was written while crawling.
+    if fmt == "ndjson":
+        return
+    with open(output, "w") as f:
+        if fmt == "json":
+            write_json(endpoints, f)
+        else:
+            skipped = crawler.clusters.closed() if crawler.clusters is not None else None
+            write_markdown(endpoints, url, f, skipped)
+
+
+def _print_client(args, prof, client):
+    if (args.verbose or prof is not None) and client.requests:
+        reused = 1 - client.connections / client.requests
+        print(f"  {dim('connections:')} {client.connections} opened for {client.requests} request(s) "
+              f"({reused:.0%} reused), {client.wire_bytes / 1e6:.1f} MB on the wire for "
+              f"{client.body_bytes / 1e6:.1f} MB of bodies")
+    limiter = client.limiter
+    if limiter.throttled:
+        limits = ", ".join(f"{host} {limit:.1f}" for host, limit in sorted(limiter.limits().items()))
+        print(f"  {dim('throttle:')} {limiter.throttled} 429/503 response(s), "
+              f"{client.retries} retried; concurrency now {limits}")
+
+
+def _batch_outputs(targets: list[str], outdir: str, fmt: str) -> dict[str, str]:
+    outputs = {}
+    used = set()
+    for url in targets:
+        base, ext = os.path.splitext(_default_output(url, fmt))
+        name, n = base + ext, 1
+        while name in used:
+            n += 1
+            name = f"{base}_{n}{ext}"
+        used.add(name)
+        outputs[url] = os.path.join(outdir, name)
+    return outputs
+
+
+def _run_batch(args, headers: dict[str, str], ua: str | None, cache, prof,
+               stop: threading.Event) -> int:
+    targets = _read_targets(args.targets_file)
+    outdir = args.output or "."
+    os.makedirs(outdir, exist_ok=True)
+    outputs = _batch_outputs(targets, outdir, args.format)
+    crawler_cls, engine_kwargs = _engine(args)
+    kwargs = _crawl_kwargs(args, headers, ua, cache)
+
+    # One client, process pool and analysis cache for every target: a host
+    # seen by several targets keeps its connections and limits, and a bundle
+    # served by several targets on one domain is extracted once.
+    client = HttpClient(headers=headers, rate_limit=args.rate_limit, workers=args.workers,
+                        user_agent=ua, max_inflight=args.max_inflight, cache=cache,
+                        adaptive=not args.no_adapt, connect_timeout=args.connect_timeout,
+                        read_timeout=args.read_timeout)
+    if args.engine == "async":
+        client.add_threads(args.concurrency)
+    cpu = (ProcessPoolExecutor(max_workers=args.cpu_workers, initializer=init_worker)
+           if args.cpu_workers > 0 else None)
+    shared = Shared(client, cpu)
+
+    def crawl(url: str):
+        if stop.is_set():
+            return None
+        output = outputs[url]
+        stream = open(output, "w") if args.format == "ndjson" else None
+        try:
+            crawler = crawler_cls(url, shared=shared, stop=stop,
+                                  on_endpoints=NdjsonWriter(stream).update if stream else None,
+                                  **kwargs, **engine_kwargs)
+            endpoints = crawler.run()
+        finally:
+            if stream is not None:
+                stream.close()
+        _write_report(endpoints, url, output, args.format, crawler)
+        return crawler, endpoints
+
+    failed = skipped = analysed = reused = 0
+    pool = ThreadPoolExecutor(max_workers=max(1, args.parallel))
+    try:
+        with profiling.stage("crawl"):
+            futs = {pool.submit(crawl, url): url for url in targets}
+            for fut in as_completed(futs):
+                url = futs[fut]
+                try:
+                    done = fut.result()
+                except Exception as e:
+                    failed += 1
+                    print(f"  {red('x')}  {white(url)}  {dim(f'{type(e).__name__}: {e}')}")
+                    continue
+                if done is None:
+                    skipped += 1
+                    continue
+                crawler, endpoints = done
+                analysed += crawler.analysed
+                reused += crawler.reused
+                note = f"  {yellow(f'{len(crawler.over_budget)} over budget')}" if crawler.over_budget else ""
+                if crawler.clusters is not None and crawler.clusters.skipped:
+                    note += f"  {dim(f'{crawler.clusters.skipped} templated page(s) skipped')}"
+                if crawler.interrupted:
+                    note += f"  {yellow('partial')}"
+                print(f"  {bright_green('+')}  {white(url)}  {bold(str(len(endpoints)))} endpoint(s)  "
+                      f"{dim('->')} {outputs[url]}{note}")
+    finally:
+        pool.shutdown(cancel_futures=True)
+        client.close()
+        if cpu is not None:
+            cpu.shutdown(cancel_futures=True)
+        if cache is not None:
+            cache.close()
+
+    print(f"\n  {dim('batch:')} {len(targets) - failed - skipped} of {len(targets)} target(s) crawled; "
+          f"{analysed} body(ies) analysed, {reused} reused from other pages or targets")
+    if skipped:
+        print(f"  {yellow('!')}  {skipped} target(s) not started before the interrupt")
+    if cache is not None:
+        print(f"  {dim('cache:')} {cache.revalidated} not modified, {cache.stored} stored")
+    _print_client(args, prof, client)
+    if prof is not None:
+        _print_profile(prof, args.profile_json)
+    return 1 if failed else 0
+
+
 def entry():
-    args = _build_parser().parse_args()
+    parser = _build_parser()
+    args = parser.parse_args()
+    if args.targets_file and args.state:
+        parser.error("--state keeps one target's state and cannot be used with --targets-file")
+    if args.targets_file and args.frontier:
+        parser.error("--frontier holds one target's crawl and cannot be used with --targets-file")
+    if args.checkpoint and (args.targets_file or args.frontier):
+        parser.error("--checkpoint holds one in-memory crawl and cannot be used with "
+                     "--targets-file or --frontier")
+    if args.prioritize and args.frontier:
+        parser.error("--frontier hands out pages in the order found and cannot be used with --prioritize")
+    if args.resume and not args.checkpoint:
+        parser.error("--resume needs --checkpoint")
 
     if args.no_color:
-        import os
         os.environ["NO_COLOR"] = "1"
         import color as _col
         _col._TTY = False
 
-    url = args.url if "://" in args.url else f"https://{args.url}"
-    output = args.output or _default_output(url, args.format)
     headers = _parse_headers(args.header)
     ua = UA_PRESETS.get(args.ua) if args.ua else args.user_agent
 
     print_banner()
 
+    if args.targets_file:
+        print(dim("  " + "─" * 52))
+        _info("targets", args.targets_file)
+        _info("output ", args.output or ".")
+        _info("format ", args.format)
+        _info("engine ", f"{args.engine}, {args.parallel} target(s) at once")
+        if args.cache_dir:
+            _info("cache  ", args.cache_dir)
+        print(dim("  " + "─" * 52) + "\n")
+        prof = profiling.enable() if args.profile or args.profile_json else None
+        cache = ResponseCache(args.cache_dir, args.cache_size * 1024 * 1024) if args.cache_dir else None
+        stop = threading.Event()
+        _handle_signals(stop)
+        sys.exit(_run_batch(args, headers, ua, cache, prof, stop))
+
+    url = args.url if "://" in args.url else f"https://{args.url}"
+    output = args.output or _default_output(url, args.format)
+    try:
+        frontier = Frontier(args.frontier, url.rstrip("/")) if args.frontier else None
+        resume = checkpoint.load(args.checkpoint, url.rstrip("/")) if args.resume else None
+    except (ValueError, OSError, sqlite3.Error) as e:
+        parser.error(str(e))
+
     print(dim("  " + "─" * 52))
     _info("target", url)
     _info("depth ", str(args.max_depth))
     _info("output", output)
     _info("format", args.format)
+    _info("engine", args.engine)
+    if args.cache_dir:
+        _info("cache ", args.cache_dir)
+    if args.state:
+        _info("state ", args.state)
+    if args.frontier:
+        _info("frontier", args.frontier)
+    if args.checkpoint:
+        resumed = f", resuming {len(resume.queue)} queued page(s)" if resume else ""
+        _info("checkpoint", args.checkpoint + resumed)
     print(dim("  " + "─" * 52) + "\n")
 
-    crawler = Crawler(
+    crawler_cls, engine_kwargs = _engine(args)
+
+    prof = profiling.enable() if args.profile or args.profile_json else None
+    state = rescan.load(args.state, url.rstrip("/")) if args.state else None
+    cache = ResponseCache(args.cache_dir, args.cache_size * 1024 * 1024) if args.cache_dir else None
+    # ndjson is written while crawling so other tools can tail it.
+    stream = open(output, "w") if args.format == "ndjson" else None
+    stop = threading.Event()
+    _handle_signals(stop)
+
+    crawler = crawler_cls(
         url,
-        max_depth=args.max_depth,
-        max_pages=args.max_pages,
-        headers=headers,
-        rate_limit=args.rate_limit,
-        workers=args.workers,
-        verbose=args.verbose,
-        user_agent=ua,
+        state=state,
+        frontier=frontier,
+        checkpoint_path=args.checkpoint,
+        checkpoint_every=args.checkpoint_every,
+        resume=resume,
+        stop=stop,
+        on_endpoints=NdjsonWriter(stream).update if stream else None,
+        **_crawl_kwargs(args, headers, ua, cache),
+        **engine_kwargs,
     )
-    endpoints = crawler.run()
+    try:
+        with profiling.stage("crawl"):
+            endpoints = crawler.run()
+    finally:
+        if cache is not None:
+            cache.close()
+        if stream is not None:
+            stream.close()
+        if frontier is not None:
+            frontier.close()
+    if cache is not None:
+        print(f"  {dim('cache:')} {cache.revalidated} not modified, {cache.stored} stored")
+    if crawler.interrupted:
+        hint = f"; continue with --checkpoint {args.checkpoint} --resume" if args.checkpoint else ""
+        print(f"  {yellow('!')}  interrupted, the report below is partial{hint}")
+    if crawler.stopped_early:
+        print(f"  {dim('early stop:')} under {args.min_yield:g} new endpoint(s) per page over the last "
+              f"{args.yield_window} page(s)")
+    if crawler.clusters is not None and crawler.clusters.skipped:
+        closed = crawler.clusters.closed()
+        print(f"  {dim('templates:')} {crawler.clusters.skipped} page(s) skipped from "
+              f"{len(closed)} template(s) that stopped adding endpoints:")
+        for t, n in closed.items():
+            if n:
+                print(f"       {dim(t)}  {n}")
+    if crawler.skipped_libraries:
+        print(f"  {dim('libraries:')} {crawler.skipped_libraries} known bundle(s) skipped")
+    _print_client(args, prof, crawler.client)
+    if crawler.over_budget:
+        print(f"  {yellow('!')}  {len(crawler.over_budget)} script(s) over the {args.js_budget:g}s "
+              f"extraction budget, results partial:")
+        for source in crawler.over_budget.values():
+            print(f"       {dim(source)}")
+    if args.state:
+        _save_state(args, crawler, state, endpoints, url, output)
+    if prof is not None:
+        _print_profile(prof, args.profile_json)
 
     if not endpoints:
         print(f"\n  {yellow('!')}  {white('nothing found')}")
@@ -120,12 +501,6 @@ def entry():
 
     print("\n" + dim("  " + "─" * 52) + "\n")
 
-    if args.format == "json":
-        body = json_report(endpoints)
-    else:
-        body = markdown(endpoints, url)
-
-    with open(output, "w") as f:
-        f.write(body)
+    _write_report(endpoints, url, output, args.format, crawler)
 
     print(f"  {bright_green('+')}  {dim('wrote')} {white(output)}\n")
@@ -1,10 +1,45 @@
 from __future__ import annotations
 
 import sys
+import threading
 import time
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import zlib
+from functools import partial
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlparse
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+import profiling
+from ratelimit import BACKOFF_STATUS, RateLimiter
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    try:
+        import brotlicffi as brotli
+    except ImportError:
+        brotli = None
+
+
+def _br_bounded() -> bool:
+    """Whether the brotli binding can cap a call's output (brotli >= 1.2's
+    ``output_buffer_limit``); without that one small chunk could expand
+    to any size before the body cap is checked, so br is not requested."""
+    if brotli is None:
+        return False
+    try:
+        brotli.Decompressor().process(b"", output_buffer_limit=1)
+    except Exception:
+        return False
+    return True
+
+
+_BR = _br_bounded()
 
 _DEFAULT_UA = (
     "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
@@ -30,63 +65,332 @@ UA_PRESETS: dict[str, str] = {
     ),
     "bot": "Googlebot/2.1 (+http://www.google.com/bot.html)",
 }
-_TIMEOUT = 15
+CONNECT_TIMEOUT = 15
+READ_TIMEOUT = 15
+# Cap on a body's decoded size; compressed bodies are decoded incrementally
+# and stop here however small they were on the wire.
 _MAX_BODY = 5 * 1024 * 1024  
+_ACCEPT_ENCODING = "gzip, deflate" + (", br" if _BR else "")
+# Hosts whose connection pools are kept open at once.
+_POOLS = 32
+# Retries of a request answered 429/503, waiting out its Retry-After, or
+# _BACKOFF * 2**attempt seconds without one. Longer Retry-Afters give up.
+_RETRIES = 3
+_BACKOFF = 1.0
+_MAX_RETRY_AFTER = 60.0
+
+
+# Connections that time their TCP/TLS setup and report each new socket to
+# on_connect, which urllib3 hands them through the pool's connection kwargs.
+
+class _HTTPConnection(HTTPConnection):
+    def __init__(self, *args, on_connect=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._on_connect = on_connect
+
+    def connect(self):
+        with profiling.stage("http.connect"):
+            super().connect()
+        self._on_connect()
+
+
+class _HTTPSConnection(HTTPSConnection):
+    def __init__(self, *args, on_connect=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._on_connect = on_connect
+
+    def connect(self):
+        with profiling.stage("http.connect"):
+            super().connect()
+        self._on_connect()
+
+
+class _HTTPPool(HTTPConnectionPool):
+    ConnectionCls = _HTTPConnection
+
+
+class _HTTPSPool(HTTPSConnectionPool):
+    ConnectionCls = _HTTPSConnection
+
+
+class _Adapter(HTTPAdapter):
+    """Adapter whose connections call ``on_connect`` for each new socket."""
+
+    def __init__(self, on_connect, **kwargs):
+        self._on_connect = on_connect
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": partial(_HTTPPool, on_connect=self._on_connect),
+            "https": partial(_HTTPSPool, on_connect=self._on_connect),
+        }
+
+
+class DecodeError(Exception):
+    """A response body that does not decode as its Content-Encoding says."""
+
+
+class _Decoder:
+    """Incremental Content-Encoding decoder that stops at a size limit, so a
+    small compressed body cannot expand past _MAX_BODY in memory."""
+
+    def __init__(self, encoding: str):
+        self._encoding = encoding
+        self._obj = self._new()
+        self._started = False
+
+    @staticmethod
+    def supports(encoding: str) -> bool:
+        return encoding in ("", "identity", "gzip", "x-gzip", "deflate") or (
+            encoding == "br" and _BR)
+
+    def _new(self):
+        if self._encoding in ("gzip", "x-gzip"):
+            return zlib.decompressobj(16 + zlib.MAX_WBITS)
+        if self._encoding == "deflate":
+            return zlib.decompressobj()
+        if self._encoding == "br":
+            return brotli.Decompressor()
+        return None
+
+    def decode(self, data: bytes, limit: int) -> bytes:
+        """Up to ``limit`` decoded bytes of ``data``. Raises DecodeError on
+        a corrupt body."""
+        try:
+            return self._decode(data, limit)
+        except zlib.error as e:
+            raise DecodeError(f"bad {self._encoding} body: {e}") from e
+        except Exception as e:
+            if self._encoding == "br" and isinstance(e, brotli.error):
+                raise DecodeError(f"bad br body: {e}") from e
+            raise
+
+    def _decode(self, data: bytes, limit: int) -> bytes:
+        obj = self._obj
+        if obj is None:
+            return data
+        if self._encoding == "br":
+            # Output past the limit stays in the decompressor; the body is
+            # cut there anyway.
+            return obj.process(data, output_buffer_limit=limit)
+        out = []
+        while data and limit > 0:
+            try:
+                chunk = obj.decompress(data, limit)
+            except zlib.error:
+                if self._encoding != "deflate" or self._started:
+                    raise
+                # Some servers send raw deflate without the zlib header.
+                obj = self._obj = zlib.decompressobj(-zlib.MAX_WBITS)
+                self._started = True
+                continue
+            self._started = True
+            out.append(chunk)
+            limit -= len(chunk)
+            if obj.eof and obj.unused_data:
+                # Concatenated gzip members.
+                data = obj.unused_data
+                obj = self._obj = self._new()
+            else:
+                data = obj.unconsumed_tail
+        return b"".join(out)
+
+
+def _retry_after(value: str | None, attempt: int) -> float | None:
+    """Seconds to wait before retrying, or None to give up."""
+    if value is None:
+        return _BACKOFF * 2 ** attempt
+    try:
+        delay = float(value)
+    except ValueError:
+        try:
+            delay = parsedate_to_datetime(value).timestamp() - time.time()
+        except (TypeError, ValueError, OverflowError):
+            return _BACKOFF * 2 ** attempt
+    delay = max(0.0, delay)
+    return delay if delay <= _MAX_RETRY_AFTER else None
 
 
 class HttpClient:
-    def __init__(self, headers=None, rate_limit=0.0, workers=6, user_agent=None):
+    def __init__(self, headers=None, rate_limit=0.0, workers=6, user_agent=None,
+                 max_inflight=None, cache=None, adaptive=True,
+                 connect_timeout=CONNECT_TIMEOUT, read_timeout=READ_TIMEOUT):
         self._session = requests.Session()
         self._session.headers["User-Agent"] = user_agent or _DEFAULT_UA
         self._session.headers["Accept"] = "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8"
         self._session.headers["Accept-Language"] = "en-US,en;q=0.5"
+        self._session.headers["Accept-Encoding"] = _ACCEPT_ENCODING
         if headers:
             self._session.headers.update(headers)
-        self._delay = rate_limit
-        self._last_req = 0.0
+        self._timeout = (connect_timeout, read_timeout)
+        # rate_limit is the minimum interval between requests to one host.
+        self.limiter = RateLimiter(rate=1 / rate_limit if rate_limit > 0 else 0.0,
+                                   ceiling=workers, adaptive=adaptive)
+        self.retries = 0
+        # Sockets opened, requests sent, and bytes received before and after
+        # decoding; connections / requests is the share not reused.
+        self.connections = 0
+        self.requests = 0
+        self.wire_bytes = 0
+        self.body_bytes = 0
+        self._stats_lock = threading.Lock()
+        self._mount()
         self._pool = ThreadPoolExecutor(max_workers=workers)
+        self._max_inflight = max(1, max_inflight or workers)
+        self._cache = cache
+
+    def _mount(self):
+        # One pooled connection per thread that may hold a request slot, so
+        # none is closed after use and reopened by the next request.
+        for prefix in ("http://", "https://"):
+            self._session.mount(prefix, _Adapter(self._connected, pool_connections=_POOLS,
+                                                 pool_maxsize=self.limiter.ceiling))
+
+    def _connected(self):
+        with self._stats_lock:
+            self.connections += 1
+
+    def add_threads(self, n: int):
+        """Make room for ``n`` more threads calling get() at once, e.g. page
+        fetchers alongside the script workers. Call before the first request."""
+        self.limiter.ceiling += n
+        self._mount()
 
     def get(self, url) -> str | None:
-        self._throttle()
-        try:
-            r = self._session.get(url, timeout=_TIMEOUT, stream=True)
-            r.raise_for_status()
-            ct = r.headers.get("content-type", "")
-            if not any(t in ct for t in ("text/", "javascript", "json", "xml")):
-                r.close()
+        host = urlparse(url).netloc
+        cond = {}
+        known = self._cache.validators(url) if self._cache else None
+        if known:
+            if known.etag:
+                cond["If-None-Match"] = known.etag
+            if known.last_modified:
+                cond["If-Modified-Since"] = known.last_modified
+        attempt = 0
+        while True:
+            self.limiter.acquire(host)
+            status = latency = pause = None
+            try:
+                # Time to response headers, including connection setup when a new
+                # connection was needed (also recorded on its own as http.connect).
+                t0 = time.perf_counter()
+                with profiling.stage("http.ttfb"):
+                    r = self._session.get(url, timeout=self._timeout, stream=True, headers=cond)
+                latency = time.perf_counter() - t0
+                with self._stats_lock:
+                    self.requests += 1
+                status = r.status_code
+                if status in BACKOFF_STATUS:
+                    r.close()
+                    pause = _retry_after(r.headers.get("retry-after"), attempt)
+                    if pause is not None and attempt < _RETRIES:
+                        attempt += 1
+                        self.retries += 1
+                        continue
+                if status == 304 and known:
+                    r.close()
+                    cached = self._cache.body(url)
+                    if cached is not None:
+                        return cached[0].decode(cached[1], errors="replace")
+                    # Evicted since the validators were read; ask again unconditionally.
+                    cond, known = {}, None
+                    continue
+                return self._read(url, r)
+            except (requests.RequestException, DecodeError) as e:
+                print(f"  [!] {url}: {e}", file=sys.stderr)
                 return None
-            chunks: list[bytes] = []
-            total = 0
+            finally:
+                self.limiter.release(host, status, latency, pause)
+
+    def _read(self, url, r) -> str | None:
+        r.raise_for_status()
+        ct = r.headers.get("content-type", "")
+        if not any(t in ct for t in ("text/", "javascript", "json", "xml")):
+            r.close()
+            return None
+        w0, c0 = time.perf_counter(), time.thread_time()
+        try:
+            raw, wire = self._body(r)
+        finally:
+            r.close()
+        with self._stats_lock:
+            self.wire_bytes += wire
+            self.body_bytes += len(raw)
+        if profiling.current is not None:
+            profiling.current.record("http.body", time.perf_counter() - w0,
+                                     time.thread_time() - c0, len(raw))
+        enc = r.encoding or "utf-8"
+        if self._cache is not None:
+            etag = r.headers.get("etag")
+            modified = r.headers.get("last-modified")
+            if etag or modified:
+                self._cache.store(url, raw, enc, etag, modified)
+        return raw.decode(enc, errors="replace")
+
+    @staticmethod
+    def _body(r) -> tuple[bytes, int]:
+        """The decoded body, stopping once it reaches _MAX_BODY, and the
+        number of bytes read off the wire for it."""
+        encoding = r.headers.get("content-encoding", "").strip().lower()
+        chunks: list[bytes] = []
+        total = wire = 0
+        if not _Decoder.supports(encoding):
+            # Stacked or unknown encodings: let urllib3 decode them.
             for chunk in r.iter_content(chunk_size=65536):
                 chunks.append(chunk)
                 total += len(chunk)
                 if total >= _MAX_BODY:
                     break
-            r.close()
-            raw = b"".join(chunks)
-            enc = r.encoding or "utf-8"
-            return raw.decode(enc, errors="replace")
-        except requests.RequestException as e:
-            print(f"  [!] {url}: {e}", file=sys.stderr)
-            return None
+            return b"".join(chunks), total
+        decoder = _Decoder(encoding)
+        for data in r.raw.stream(65536, decode_content=False):
+            wire += len(data)
+            chunk = decoder.decode(data, _MAX_BODY - total)
+            chunks.append(chunk)
+            total += len(chunk)
+            if total >= _MAX_BODY:
+                break
+        return b"".join(chunks), wire
 
     def get_many(self, urls) -> dict[str, str]:
-        results = {}
-        futs = {self._pool.submit(self.get, u): u for u in urls}
-        for fut in as_completed(futs):
-            url = futs[fut]
-            body = fut.result()
-            if body is not None:
-                results[url] = body
-        return results
-
-    def _throttle(self):
-        if self._delay <= 0:
-            return
-        elapsed = time.monotonic() - self._last_req
-        if elapsed < self._delay:
-            time.sleep(self._delay - elapsed)
-        self._last_req = time.monotonic()
+        return dict(self.iter_many(urls))
+
+    def iter_many(self, urls, max_inflight=None):
+        """Yield (url, body) pairs as fetches complete.
+
+        At most ``max_inflight`` bodies are downloading or waiting to be
+        consumed at any time; a slot is refilled only after the caller has
+        finished with the body it was handed, so peak memory stays bounded
+        while extraction overlaps with the remaining downloads.
+        """
+        limit = max(1, max_inflight or self._max_inflight)
+        todo = iter(urls)
+        futs = {}
+
+        def submit():
+            for url in todo:
+                futs[self._pool.submit(self.get, url)] = url
+                return
+
+        for _ in range(limit):
+            submit()
+        try:
+            while futs:
+                done = list(wait(futs, return_when=FIRST_COMPLETED).done)
+                while done:
+                    fut = done.pop()
+                    url = futs.pop(fut)
+                    body = fut.result()
+                    # Drop our references before refilling so the body can be freed.
+                    del fut
+                    if body is not None:
+                        yield url, body
+                    body = None
+                    submit()
+        finally:
+            for fut in futs:
+                fut.cancel()
 
     def close(self):
         self._pool.shutdown(wait=False)
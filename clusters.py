@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import re
+from typing import Iterable
+from urllib.parse import urlparse
+
+# Path segment parts that vary between pages rendered from one template.
+_UUID_RE = re.compile(r"[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}", re.I)
+_HASH_RE = re.compile(r"(?=[a-z]*\d)[0-9a-f]{16,}", re.I)
+_NUM_RE = re.compile(r"\d+")
+# Hyphen or underscore separated words; this many or more make a slug.
+_SLUG_SPLIT_RE = re.compile(r"[-_]+")
+_SLUG_WORDS = 3
+
+
+def _segment(seg: str) -> str:
+    seg = _UUID_RE.sub("{uuid}", seg)
+    seg = _HASH_RE.sub("{hash}", seg)
+    seg = _NUM_RE.sub("{id}", seg)
+    stem, dot, ext = seg.rpartition(".")
+    if not dot:
+        stem, ext = seg, ""
+    if len([w for w in _SLUG_SPLIT_RE.split(stem) if w]) >= _SLUG_WORDS:
+        return "{slug}" + dot + ext
+    return seg
+
+
+def template(url: str) -> str:
+    """The URL's path with IDs, UUIDs, hashes and slugs replaced by
+    placeholders: /product/1001 and /product/99999 both give /product/{id}."""
+    try:
+        path = urlparse(url).path
+    except ValueError:
+        return url
+    return "/".join(_segment(s) for s in path.rstrip("/").split("/")) or "/"
+
+
+class _Cluster:
+    __slots__ = ("scripts", "streak", "closed", "skipped")
+
+    def __init__(self):
+        self.scripts: frozenset[str] | None = None
+        self.streak = 0
+        self.closed = False
+        self.skipped = 0
+
+
+class Clusters:
+    """Pages grouped by URL template (see ``template``), learned while
+    crawling.
+
+    ``observe`` reports each visited page: its external script URLs and how
+    many new endpoints it found. Once ``samples`` pages of a template in a
+    row loaded the same scripts and found nothing new, the template is
+    closed and ``skip`` turns away its remaining pages; a page that finds
+    endpoints or loads other scripts starts the count again.
+    """
+
+    def __init__(self, samples: int):
+        self.samples = samples
+        self._clusters: dict[str, _Cluster] = {}
+        # Pages turned away, over every template.
+        self.skipped = 0
+
+    def observe(self, url: str, scripts: Iterable[str], new_endpoints: int):
+        key = template(url)
+        c = self._clusters.get(key)
+        if c is None:
+            c = self._clusters[key] = _Cluster()
+        if c.closed:
+            return
+        scripts = frozenset(scripts)
+        if new_endpoints:
+            c.streak = 0
+        elif scripts == c.scripts:
+            c.streak += 1
+        else:
+            c.streak = 1
+        c.scripts = scripts
+        if c.streak >= self.samples:
+            c.closed = True
+
+    def skip(self, url: str) -> bool:
+        """Whether ``url`` belongs to a closed template; it is then counted
+        as skipped, so ask once per page."""
+        c = self._clusters.get(template(url))
+        if c is None or not c.closed:
+            return False
+        c.skipped += 1
+        self.skipped += 1
+        return True
+
+    def closed(self) -> dict[str, int]:
+        """Closed templates and the pages skipped for each, most first."""
+        out = {t: c.skipped for t, c in self._clusters.items() if c.closed}
+        return dict(sorted(out.items(), key=lambda kv: -kv[1]))
@@ -1,21 +1,26 @@
 from __future__ import annotations
 
+import asyncio
+import hashlib
 import re
+import signal
 import sys
+import threading
+import time
 from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import replace
 from urllib.parse import urlparse, urlunparse
 
-try:
-    import lxml  
-    _BS_PARSER = "lxml"
-except ImportError:
-    _BS_PARSER = "html.parser"
-
-from bs4 import BeautifulSoup
-
-from client import HttpClient
+import checkpoint
+import profiling
+from client import CONNECT_TIMEOUT, READ_TIMEOUT, HttpClient
+from clusters import Clusters
+from frontier import Frontier
 from infer import infer_method
-from models import EndpointStore, Hit
+from priority import YieldQueue
+from models import MAX_PARAM_VALUES, EndpointStore, Hit
+from seen import SeenSet
 from resolve import (
     is_template_only,
     clean_templates,
@@ -23,14 +28,8 @@ from resolve import (
     normalize,
     same_origin,
 )
-from extractors import (
-    extract_from_js,
-    extract_forms,
-    extract_data_urls,
-    extract_script_srcs,
-    extract_inline_js,
-    extract_links,
-)
+from extractors import BudgetExceeded, PageSignals, extract_from_js, parse_page
+from extractors.scan import back_space, back_word
 
 _SENTINELS = {
     "__graphql__": "/graphql",
@@ -46,6 +45,11 @@ _VAR_BASEURL_RE = re.compile(
     re.I,
 )
 
+# '+' followed by a string literal, and that literal: the right-hand side of
+# an identifier-plus-string concatenation.
+_CONCAT_SITE_RE = re.compile(r"""\+(?=\s*[`"'])""")
+_CONCAT_PATH_RE = re.compile(r"""\+\s*[`"']([^`"'\s{}]+)[`"']""")
+
 _PATH_LITERAL_RE = re.compile(
     r"""[`"']([A-Za-z][A-Za-z0-9_.%-]*(?:/[A-Za-z0-9_.%-]+){2,})[`"']"""
 )
@@ -59,6 +63,18 @@ _API_DOMAIN_RE = re.compile(r"(?:^|\.)api[.\-]|[.\-]api\.", re.I)
 
 MAX_PAGES = 300
 
+# Most hits one file's path literals may produce when joined with each of
+# its variable-assigned base URLs.
+MAX_BASE_JOINS = 5000
+
+# Seconds between checks of a shared frontier that is empty while other
+# processes still hold claims.
+_FRONTIER_POLL = 0.2
+
+
+def _digest(text: str) -> bytes:
+    return hashlib.blake2b(text.encode("utf-8", "surrogatepass"), digest_size=16).digest()
+
 
 def _page_key(url: str) -> str:
     """Normalise a URL for crawl deduplication: strip query string and fragment."""
@@ -66,78 +82,498 @@ def _page_key(url: str) -> str:
     return urlunparse((p.scheme, p.netloc, p.path.rstrip("/") or "/", "", "", ""))
 
 
+# A cached extraction result: (hit, relative, via), see _extract_js.
+_JsHit = tuple[Hit, bool, str]
+
+
+def _base_hits(js: str) -> tuple[list[str], list[_JsHit]]:
+    """Return the file's API bases and the hits built by joining its
+    variable-assigned base URLs with path literals."""
+    hits: list[_JsHit] = []
+
+    # Collect API base URLs declared in this file (e.g. from axios.create),
+    # once each: every relative hit is joined with every one of them. Those on
+    # the crawled domain are dropped when the hits are replayed, so the
+    # extraction itself does not depend on the target.
+    extra_bases = list(dict.fromkeys(m.group(1).rstrip("/") for m in _BASEURL_RE.finditer(js)))
+
+    # Collect variable-assigned base URLs: const X = "https://host/path/"
+    var_bases: dict[str, str] = {}
+    for m in _VAR_BASEURL_RE.finditer(js):
+        var_bases[m.group(1)] = m.group(2).rstrip("/")
+
+    if not var_bases:
+        return extra_bases, hits
+
+    # Explicit concatenations X + "path", for every var base X in one pass.
+    for var_name, path in _concatenations(js, var_bases):
+        if "/" in path and not path.startswith(("http:", "https:")):
+            hits.append((Hit(url=var_bases[var_name] + "/" + path.lstrip("/")), False, ""))
+
+    # Also join multi-segment path string literals, which are likely route
+    # arguments passed to service wrapper methods (e.g. Angular HttpClient
+    # services), with each distinct base, up to MAX_BASE_JOINS hits.
+    all_bases = list(dict.fromkeys(var_bases.values()))
+    budget = MAX_BASE_JOINS
+    for pm in _PATH_LITERAL_RE.finditer(js):
+        path = pm.group(1)
+        # Skip anything that looks like a file path or non-route string
+        if path.endswith((".js", ".css", ".html", ".png", ".jpg", ".svg")):
+            continue
+        rel = path.lstrip("/")
+        for base_url in all_bases[:budget]:
+            hits.append((Hit(url=base_url + "/" + rel), False, ""))
+        budget -= len(all_bases)
+        if budget <= 0:
+            break
+
+    return extra_bases, hits
+
+
+def _concatenations(js: str, names: dict[str, str]) -> list[tuple[str, str]]:
+    """(name, literal) for each ``name + "literal"`` in ``js``, grouped by
+    name in the order of ``names`` and in source order within each, the way
+    one ``name\\s*\\+\\s*"..."`` finditer per name would find them.
+
+    Each '+' before a literal is visited once, and the names ending the
+    identifier in front of it are looked up by suffix length.
+    """
+    lengths = sorted({len(n) for n in names})
+    found: dict[str, list[str]] = {n: [] for n in names}
+    ends: dict[str, int] = {}
+    for site in _CONCAT_SITE_RE.finditer(js):
+        plus = site.start()
+        end = back_space(js, plus)
+        start = back_word(js, end)
+        if start == end:
+            continue
+        m = _CONCAT_PATH_RE.match(js, plus)
+        if m is None:
+            continue
+        for n in lengths:
+            if n > end - start:
+                break
+            name = js[end - n:end]
+            # A per-name finditer resumes after its last match.
+            if name in found and ends.get(name, -1) <= end - n:
+                found[name].append(m.group(1))
+                ends[name] = m.end()
+    return [(name, path) for name, paths in found.items() for path in paths]
+
+
+def _extract_js(js: str, budget: float | None = None) -> tuple[list[_JsHit], bool]:
+    """Return (hit, relative, via) triples, and whether extraction finished
+    within ``budget`` seconds. Relative hits still need resolving against the
+    URL of whichever source the content came from; ``via`` is the netloc of
+    the extra base a hit was joined with, or "" (see Crawler._replay_js)."""
+    deadline = None if budget is None else time.monotonic() + budget
+    with profiling.stage("ingest.bases", len(js)):
+        extra_bases, hits = _base_hits(js)
+    complete = True
+    try:
+        found = extract_from_js(js, None if deadline is None else max(0.0, deadline - time.monotonic()))
+    except BudgetExceeded as e:
+        found, complete = e.hits, False
+    with profiling.stage("ingest.post"):
+        complete &= _post_process(found, extra_bases, hits, deadline)
+    return hits, complete
+
+
+def _post_process(found: list[Hit], extra_bases: list[str], hits: list[_JsHit],
+                  deadline: float | None = None) -> bool:
+    """Clean extracted hits and append them to ``hits``, plus joins of each
+    relative one with the file's API bases. Returns False if it stopped
+    early at ``deadline``."""
+    for n, hit in enumerate(found):
+        if deadline is not None and not n & 255 and time.monotonic() > deadline:
+            return False
+        if is_template_only(hit.url):
+            continue
+        raw = _SENTINELS.get(hit.url, hit.url)
+        cleaned = clean_templates(raw)
+
+        # For relative paths: also resolve against each base found in this file.
+        # Use the full base for paths that fit under it; use bare origin for others.
+        if not cleaned.startswith(("http://", "https://")) and extra_bases:
+            seen_joined: set[str] = set()
+            for base in extra_bases:
+                p = urlparse(base)
+                base_path = p.path.rstrip("/")
+                rel = cleaned.lstrip("/")
+                if base_path and not cleaned.startswith(base_path + "/"):
+                    # Path does not belong under this service base – resolve against origin only
+                    joined = f"{p.scheme}://{p.netloc}/{rel}"
+                else:
+                    joined = base + "/" + rel
+                if joined not in seen_joined:
+                    seen_joined.add(joined)
+                    hits.append((replace(hit, url=joined), False, p.netloc))
+
+        hits.append((replace(hit, url=cleaned), True, ""))
+    return True
+
+
+class Shared:
+    """What crawlers running in one process can share: an HTTP client (its
+    connection pools, fetch threads and per-host limits), a process pool,
+    and the content-addressed analyses, so a bundle served by many targets
+    is fetched over warm connections and extracted once.
+
+    The owner closes ``client`` and shuts down ``cpu`` after the last crawl.
+    """
+
+    def __init__(self, client: HttpClient, cpu: ProcessPoolExecutor | None = None):
+        self.client = client
+        self.cpu = cpu
+        self.js_hits: dict[bytes, list[_JsHit]] = {}
+        self.pages: dict[bytes, tuple[PageSignals, list[bytes]]] = {}
+        self.partial: set[bytes] = set()
+        # Extractions running on ``cpu``, by content digest, so a crawler
+        # meeting a script another one already submitted waits for it.
+        self.pending_js: dict[bytes, Future] = {}
+
+
+def init_worker():
+    """Initializer for the parsing and extraction pool's processes: Ctrl-C
+    reaches the whole process group, and only the parent decides how the
+    crawl stops, so workers ignore SIGINT and keep the default SIGTERM
+    rather than the parent's handlers they inherit when forked."""
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+
+
+def _unwrap_profile(fut: Future) -> Future:
+    """A future for the result of ``profiling.collect`` run in a worker, that
+    merges the worker's stats into this process's profile exactly once
+    however many callers wait on it."""
+    out: Future = Future()
+
+    def done(f: Future):
+        if f.cancelled():
+            out.cancel()
+            out.set_running_or_notify_cancel()
+            return
+        e = f.exception()
+        if e is not None:
+            out.set_exception(e)
+            return
+        result, stats = f.result()
+        if profiling.current is not None:
+            profiling.current.merge(stats)
+        out.set_result(result)
+
+    fut.add_done_callback(done)
+    return out
+
+
 class Crawler:
     def __init__(self, base_url: str, max_depth=3, max_pages=MAX_PAGES,
                  headers=None, rate_limit=0.0, workers=6,
-                 verbose=False, user_agent=None):
+                 verbose=False, user_agent=None, max_inflight=None, cache=None,
+                 state=None, cpu_workers=0, libraries=None, html_backend="auto",
+                 max_param_values=MAX_PARAM_VALUES, on_endpoints=None, js_budget=None,
+                 adaptive=True, connect_timeout=CONNECT_TIMEOUT, read_timeout=READ_TIMEOUT,
+                 shared: Shared | None = None, frontier: Frontier | None = None,
+                 checkpoint_path: str | None = None, checkpoint_every=60.0,
+                 resume: checkpoint.Checkpoint | None = None, stop: threading.Event | None = None,
+                 prioritize=False, min_yield=0.0, yield_window=50, cluster_samples=0):
         self.base_url = base_url.rstrip("/")
         self.domain = urlparse(self.base_url).netloc
         self.max_depth = max_depth
         self.max_pages = max_pages
         self.verbose = verbose
-        self.client = HttpClient(headers=headers, rate_limit=rate_limit,
-                                 workers=workers, user_agent=user_agent)
-        self.store = EndpointStore()
-        self._seen_scripts: set[str] = set()
+        self.html_backend = html_backend
+        # With ``shared``, its client and process pool are used in place of
+        # the connection and cache arguments; cpu_workers should then be the
+        # size of its pool.
+        self.shared = shared
+        if shared is not None:
+            self.client = shared.client
+        else:
+            self.client = HttpClient(headers=headers, rate_limit=rate_limit,
+                                     workers=workers, user_agent=user_agent,
+                                     max_inflight=max_inflight, cache=cache, adaptive=adaptive,
+                                     connect_timeout=connect_timeout, read_timeout=read_timeout)
+        self.store = EndpointStore(max_param_values)
+        # Called after each page with the endpoints it added or changed, and
+        # once more with all of them after method inference.
+        self.on_endpoints = on_endpoints
+        if on_endpoints is not None:
+            self.store.track_changes()
+        # Script URLs already fetched, and in _bfs the crawl keys of pages
+        # found, as hashes: million-page crawls would otherwise keep every
+        # URL string alive.
+        self._seen_scripts = SeenSet()
+        # Content-addressed caches: JS digest -> extracted hits, and page
+        # digest -> (unresolved page signals, inline JS digests).
+        self._js_hits: dict[bytes, list[_JsHit]] = {} if shared is None else shared.js_hits
+        self._pages: dict[bytes, tuple[PageSignals, list[bytes]]] = {} if shared is None else shared.pages
+        # A previous run's analyses (see rescan.State) seed the caches, so
+        # only bodies that changed since then are parsed and extracted again.
+        if state is not None:
+            self._js_hits.update(state.js_hits)
+            self._pages.update(state.pages)
+        # URL -> content digest of every page and script fetched.
+        self.assets: dict[str, bytes] = {}
+        # Bodies parsed or extracted, and bodies whose earlier analysis (from
+        # this crawl, a rescan state or another target) was reused instead.
+        self.analysed = 0
+        self.reused = 0
+        # Known-library fingerprints (see fingerprints.py); matching scripts
+        # are not extracted.
+        self.libraries = libraries
+        self.skipped_libraries = 0
+        # Seconds of extraction allowed per script. Scripts that run over keep
+        # the hits found so far; over_budget maps their digest to the first
+        # source they were seen at.
+        self.js_budget = js_budget
+        self._partial: set[bytes] = set() if shared is None else shared.partial
+        self.over_budget: dict[bytes, str] = {}
+        # With cpu_workers > 0, parsing and extraction run on a process pool;
+        # these hold the analyses still in progress, by content digest.
+        self.cpu_workers = cpu_workers
+        self._cpu: ProcessPoolExecutor | None = None if shared is None else shared.cpu
+        self._pending_pages: dict[bytes, Future] = {}
+        self._pending_js: dict[bytes, Future] = {} if shared is None else shared.pending_js
+        # With a durable frontier (see frontier.py) pages are claimed from it
+        # instead of the in-memory queue, and the hits registered while
+        # visiting each page are stored with it, so the report covers pages
+        # visited by every process sharing the file.
+        self.frontier = frontier
+        self._page_hits: list[tuple[str, Hit, str, dict | None]] | None = None
+        # Progress is saved to checkpoint_path every checkpoint_every seconds
+        # and when the crawl ends; ``resume`` is a checkpoint to continue.
+        self.checkpoint_path = checkpoint_path
+        self.checkpoint_every = checkpoint_every
+        self._checkpointed = time.monotonic()
+        self.resume = resume
+        if resume is not None:
+            resume.restore(self.store)
+            self._seen_scripts = resume.seen_scripts
+        # Setting ``stop`` ends the crawl after the page being visited, as if
+        # the frontier had run dry; ``interrupted`` then tells the two apart.
+        self.stop = stop if stop is not None else threading.Event()
+        self.interrupted = False
+        # With ``prioritize`` the queue is a YieldQueue (see priority.py)
+        # rather than breadth-first. With ``min_yield`` the crawl stops once
+        # the last ``yield_window`` pages averaged fewer new endpoints each.
+        self.prioritize = prioritize
+        self.min_yield = min_yield
+        self._yields: deque[int] = deque(maxlen=max(1, yield_window))
+        self.stopped_early = False
+        # With ``cluster_samples`` pages are grouped by URL template (see
+        # clusters.py), and a template's pages are skipped once that many in
+        # a row loaded the same scripts and found no new endpoints. Skipped
+        # pages do not count towards max_pages.
+        self.clusters = Clusters(cluster_samples) if cluster_samples > 0 else None
 
     def run(self):
+        if self.shared is None and self.cpu_workers > 0:
+            self._cpu = ProcessPoolExecutor(max_workers=self.cpu_workers, initializer=init_worker)
         try:
             self._bfs()
         finally:
-            self.client.close()
+            self._pending_pages.clear()
+            if self.shared is None:
+                self._pending_js.clear()
+                self.client.close()
+                if self._cpu is not None:
+                    self._cpu.shutdown(cancel_futures=True)
+                    self._cpu = None
+        if self.frontier is not None:
+            self._load_frontier_hits()
         self._infer_missing_methods()
-        return self.store.all()
+        endpoints = self.store.all()
+        if self.on_endpoints is not None:
+            self.on_endpoints(endpoints)
+        return endpoints
 
     def _bfs(self):
-        queue: deque[tuple[str, int]] = deque([(self.base_url, 0)])
-        seen_keys: set[str] = set()
-        seen_keys.add(_page_key(self.base_url))
+        if self.frontier is not None:
+            return self._bfs_frontier()
+        queue, seen_keys = self._start_queue()
 
         while queue:
-            if len(seen_keys) >= self.max_pages:
-                self._log(f"[page cap {self.max_pages} reached, stopping crawl]")
+            if self._page_cap(seen_keys):
+                break
+            if self._stopping() or self._low_yield():
                 break
+            self._checkpoint(lambda: queue, seen_keys)
             url, depth = queue.popleft()
-            if depth > self.max_depth:
+            if depth > self.max_depth or self._skip(url):
                 continue
 
             self._log(f"[depth={depth}] {url}")
             html = self.client.get(url)
             if html is None:
                 continue
+            self._visit(html, url, depth, queue, seen_keys)
+        self._checkpoint(lambda: queue, seen_keys, force=True)
+
+    def _start_queue(self) -> tuple[deque[tuple[str, int]] | YieldQueue, SeenSet]:
+        if self.resume is not None:
+            items, seen_keys = self.resume.queue, self.resume.seen_keys
+        else:
+            items, seen_keys = [(self.base_url, 0)], SeenSet([_page_key(self.base_url)])
+        if self.prioritize:
+            return YieldQueue(items, api_signal=_API_SIGNAL_RE), seen_keys
+        return deque(items), seen_keys
+
+    def _page_cap(self, seen_keys: SeenSet) -> bool:
+        found = len(seen_keys) - (self.clusters.skipped if self.clusters is not None else 0)
+        if found >= self.max_pages:
+            self._log(f"[page cap {self.max_pages} reached, stopping crawl]")
+            return True
+        return False
 
-            soup = BeautifulSoup(html, _BS_PARSER)
-            self._process_scripts(soup, url)
-            self._process_html(soup, url)
+    def _skip(self, url: str) -> bool:
+        if self.clusters is None or not self.clusters.skip(url):
+            return False
+        self._log(f"[page template exhausted, skipping] {url}")
+        return True
 
-            if depth < self.max_depth:
-                for link in extract_links(soup, url):
-                    if not same_origin(link, self.domain):
-                        continue
-                    key = _page_key(link)
-                    if key not in seen_keys:
-                        seen_keys.add(key)
-                        queue.append((link, depth + 1))
+    def _stopping(self) -> bool:
+        if self.stop.is_set():
+            self.interrupted = True
+            self._log("[stopped, keeping the results so far]")
+            return True
+        return False
+
+    def _low_yield(self) -> bool:
+        yields = self._yields
+        if not self.min_yield or len(yields) < yields.maxlen:
+            return False
+        rate = sum(yields) / len(yields)
+        if rate >= self.min_yield:
+            return False
+        self.stopped_early = True
+        self._log(f"[{rate:.2f} new endpoints per page over the last {len(yields)}, stopping crawl]")
+        return True
+
+    def _checkpoint(self, unvisited, seen_keys: SeenSet, force=False):
+        """Save progress if a checkpoint is due. Called between pages, when
+        ``unvisited()`` returns every page found but not yet visited."""
+        if self.checkpoint_path is None:
+            return
+        if force or time.monotonic() - self._checkpointed >= self.checkpoint_every:
+            with profiling.stage("checkpoint"):
+                checkpoint.save(self.checkpoint_path, self, unvisited(), seen_keys)
+            self._checkpointed = time.monotonic()
+
+    def _bfs_frontier(self):
+        frontier = self.frontier
+        frontier.seed(_page_key(self.base_url), self.base_url)
+        while True:
+            if frontier.size() >= self.max_pages:
+                self._log(f"[page cap {self.max_pages} reached, stopping crawl]")
+                break
+            if self._stopping() or self._low_yield():
+                break
+            claimed = frontier.claim()
+            if claimed is None:
+                if not frontier.busy():
+                    break
+                time.sleep(_FRONTIER_POLL)
+                continue
+            seq, url, depth = claimed
+            self._page_hits = []
+            links: deque[tuple[str, int]] = deque()
+            skipped = depth <= self.max_depth and self._skip(url)
+            if depth <= self.max_depth and not skipped:
+                self._log(f"[depth={depth}] {url}")
+                html = self.client.get(url)
+                if html is not None:
+                    self._visit(html, url, depth, links, SeenSet())
+            frontier.complete(seq, [(_page_key(link), link, d) for link, d in links], self._page_hits,
+                              skipped)
+            self._page_hits = None
+
+    def _load_frontier_hits(self):
+        """Rebuild the store from every page completed in the frontier."""
+        self.store = EndpointStore(self.store.max_param_values)
+        for path_url, hit, source, params in self.frontier.hits():
+            self.store.add(path_url, hit=hit, source=source, params=params)
+
+    def _visit(self, html: str, url: str, depth: int,
+               queue: deque[tuple[str, int]] | YieldQueue, seen_keys: SeenSet):
+        found = len(self.store)
+        signals, inline_keys = self._parse_page(html, url)
+        page = signals.resolved(url)
+        new_scripts = self._process_scripts(page, inline_keys, url)
+        self._process_html(page, url)
+        new_endpoints = len(self.store) - found
+        self._yields.append(new_endpoints)
+        if isinstance(queue, YieldQueue):
+            queue.observe(url, new_endpoints + new_scripts)
+        if self.clusters is not None:
+            self.clusters.observe(url, page.script_srcs, new_endpoints)
+        if self.on_endpoints is not None:
+            self.on_endpoints(self.store.drain_touched())
+
+        if depth < self.max_depth:
+            # A frontier dedupes links itself (seen_keys is per page there),
+            # so its pages are only checked against templates when claimed.
+            check = self.frontier is None
+            for link in page.links:
+                if not same_origin(link, self.domain):
+                    continue
+                key = _page_key(link)
+                if seen_keys.add(key) and not (check and self._skip(link)):
+                    queue.append((link, depth + 1))
+
+    def _start_parse(self, html: str):
+        """Begin parsing a fetched page on the process pool, if there is one,
+        so it overlaps with the pages ahead of it in the queue."""
+        if self._cpu is None:
+            return
+        key = _digest(html)
+        if key not in self._pages and key not in self._pending_pages:
+            self._pending_pages[key] = self._submit(parse_page, html, self.html_backend)
+
+    def _parse_page(self, html: str, url: str) -> tuple[PageSignals, list[bytes]]:
+        key = self.assets[url] = _digest(html)
+        entry = self._pages.get(key)
+        if entry is not None:
+            self._log("[body seen before, reusing its analysis]")
+            self.reused += 1
+            return entry
+        self.analysed += 1
+        fut = self._pending_pages.pop(key, None)
+        if fut is None and self._cpu is not None:
+            fut = self._submit(parse_page, html, self.html_backend)
+        signals = fut.result() if fut is not None else parse_page(html, self.html_backend)
+        inline_keys = [self._analyse_js(js) for js in signals.inline_js]
+        entry = self._pages[key] = (replace(signals, inline_js=[]), inline_keys)
+        return entry
 
     def _infer_missing_methods(self):
         for ep in self.store._map.values():
             if not ep.methods:
                 ep.methods.add(infer_method(ep.url))
 
-    def _process_scripts(self, soup: BeautifulSoup, page_url: str):
-        srcs = extract_script_srcs(soup, page_url)
-        new_srcs = [s for s in srcs if s not in self._seen_scripts]
-        self._seen_scripts.update(new_srcs)
-
-        if new_srcs:
-            for src_url, js in self.client.get_many(new_srcs).items():
-                self._ingest_js(js, src_url)
-
-        for js in extract_inline_js(soup):
-            self._ingest_js(js, page_url)
-
-    def _process_html(self, soup: BeautifulSoup, page_url: str):
-        for url, method in extract_forms(soup, page_url):
+    def _process_scripts(self, page: PageSignals, inline_keys: list[bytes], page_url: str) -> int:
+        """Fetch and replay the page's scripts not seen before, and its
+        inline ones; return how many were new."""
+        new_srcs = [s for s in page.script_srcs if self._seen_scripts.add(s)]
+
+        # Replay each script once its hits are ready. Without a process pool
+        # that is immediately; with one, only block on the oldest extraction
+        # once enough are queued to keep every worker busy.
+        backlog: deque[tuple[bytes, str]] = deque()
+        for src_url, js in self.client.iter_many(new_srcs):
+            backlog.append((self._ingest_js(js, src_url), src_url))
+            while backlog and (self._ready(backlog[0][0])
+                               or len(self._pending_js) > 2 * self.cpu_workers):
+                self._replay_js(*backlog.popleft())
+        while backlog:
+            self._replay_js(*backlog.popleft())
+
+        for key in inline_keys:
+            self._replay_js(key, page_url)
+        return len(new_srcs)
+
+    def _process_html(self, page: PageSignals, page_url: str):
+        for url, method in page.forms:
             # Skip same-origin form actions that have no API signal in the path.
             # Navigation forms (search pages, help pages, etc.) are not endpoints.
             try:
@@ -147,7 +583,7 @@ class Crawler:
             if same_origin(url, self.domain) and not _API_SIGNAL_RE.search(p.path):
                 continue
             self._register(Hit(url=url, method=method), page_url)
-        for url in extract_data_urls(soup, page_url):
+        for url in page.data_urls:
             try:
                 p = urlparse(url)
             except Exception:
@@ -156,87 +592,66 @@ class Crawler:
                 continue
             self._register(Hit(url=url), page_url)
 
-    def _ingest_js(self, js: str, source: str):
-        # Collect cross-origin API base URLs declared in this file (e.g. from axios.create)
-        extra_bases = [
-            m.group(1).rstrip("/")
-            for m in _BASEURL_RE.finditer(js)
-            if urlparse(m.group(1)).netloc != self.domain
-        ]
-
-        # Collect variable-assigned base URLs: const X = "https://host/path/"
-        var_bases: dict[str, str] = {}
-        for m in _VAR_BASEURL_RE.finditer(js):
-            var_bases[m.group(1)] = m.group(2).rstrip("/")
-
-        # For each var base, find explicit concatenation literals: X + "path"
-        for var_name, base_url in var_bases.items():
-            concat_re = re.compile(
-                r"""%s\s*\+\s*[`"']([^`"'\s{}]+)[`"']""" % re.escape(var_name)
-            )
-            for cm in concat_re.finditer(js):
-                path = cm.group(1)
-                if path and "/" in path and not path.startswith(("http:", "https:")):
-                    joined = base_url + "/" + path.lstrip("/")
-                    self._register(Hit(url=joined), source)
-
-        # When the file contains variable-assigned base URLs, also scan for
-        # multi-segment path string literals that are likely route arguments
-        # passed to service wrapper methods (e.g. Angular HttpClient services).
-        if var_bases:
-            all_bases = list(var_bases.values())
-            for pm in _PATH_LITERAL_RE.finditer(js):
-                path = pm.group(1)
-                # Skip anything that looks like a file path or non-route string
-                if path.endswith((".js", ".css", ".html", ".png", ".jpg", ".svg")):
-                    continue
-                for base_url in all_bases:
-                    joined = base_url + "/" + path.lstrip("/")
-                    self._register(Hit(url=joined), source)
-
-        for hit in extract_from_js(js):
-            if is_template_only(hit.url):
+    def _ingest_js(self, js: str, source: str) -> bytes:
+        key = self.assets[source] = self._analyse_js(js)
+        return key
+
+    def _analyse_js(self, js: str) -> bytes:
+        """Extract hits from ``js`` unless identical content was seen before;
+        return the content digest they are cached under. On the process pool
+        the extraction may still be running; ``_replay_js`` waits for it."""
+        key = _digest(js)
+        if key not in self._js_hits and key not in self._pending_js:
+            lib = self.libraries.match(js) if self.libraries is not None else None
+            if lib:
+                self._log(f"[known library {lib}, skipping extraction]")
+                self.skipped_libraries += 1
+                self._js_hits[key] = []
+                return key
+            self.analysed += 1
+            if self._cpu is not None:
+                self._pending_js[key] = self._submit(_extract_js, js, self.js_budget)
+            else:
+                self._store_js(key, _extract_js(js, self.js_budget))
+        else:
+            self.reused += 1
+        return key
+
+    def _store_js(self, key: bytes, result: tuple[list[_JsHit], bool]):
+        self._js_hits[key], complete = result
+        if not complete:
+            self._partial.add(key)
+
+    def _submit(self, fn, *args) -> Future:
+        if profiling.current is not None:
+            # Workers profile themselves; their stats ride back with the result.
+            return _unwrap_profile(self._cpu.submit(profiling.collect, fn, *args))
+        return self._cpu.submit(fn, *args)
+
+    def _ready(self, key: bytes) -> bool:
+        fut = self._pending_js.get(key)
+        return fut is None or fut.done()
+
+    def _replay_js(self, key: bytes, source: str):
+        fut = self._pending_js.get(key)
+        if fut is not None:
+            # Storing is idempotent, so crawlers sharing the future may race here.
+            self._store_js(key, fut.result())
+            self._pending_js.pop(key, None)
+        if key in self._partial and key not in self.over_budget:
+            self.over_budget[key] = source
+            self._log(f"[extraction budget of {self.js_budget:g}s spent, partial results] {source}")
+        for hit, relative, via in self._js_hits[key]:
+            if via == self.domain:
+                # Joined with a base on this crawl's own domain, which is
+                # not an extra base here.
                 continue
-            raw = self._resolve_sentinel(hit.url)
-            cleaned = clean_templates(raw)
-
-            # For relative paths: also resolve against each cross-origin base found in this file.
-            # Use the full base for paths that fit under it; use bare origin for others.
-            if not cleaned.startswith(("http://", "https://")) and extra_bases:
-                seen_joined: set[str] = set()
-                for base in extra_bases:
-                    base_path = urlparse(base).path.rstrip("/")
-                    rel = cleaned.lstrip("/")
-                    if base_path and not cleaned.startswith(base_path + "/"):
-                        # Path does not belong under this service base – resolve against origin only
-                        p = urlparse(base)
-                        joined = f"{p.scheme}://{p.netloc}/{rel}"
-                    else:
-                        joined = base + "/" + rel
-                    if joined not in seen_joined:
-                        seen_joined.add(joined)
-                        self._register(Hit(
-                            url=joined,
-                            kind=hit.kind,
-                            method=hit.method,
-                            gql_op_type=hit.gql_op_type,
-                            gql_op_name=hit.gql_op_name,
-                            rpc_method=hit.rpc_method,
-                        ), source)
-
-            absolute = resolve(cleaned, self.base_url, source)
-            if absolute:
-                self._register(Hit(
-                    url=absolute,
-                    kind=hit.kind,
-                    method=hit.method,
-                    gql_op_type=hit.gql_op_type,
-                    gql_op_name=hit.gql_op_name,
-                    rpc_method=hit.rpc_method,
-                ), source)
-
-    def _resolve_sentinel(self, url: str) -> str:
-        return _SENTINELS.get(url, url)
+            if relative:
+                absolute = resolve(hit.url, self.base_url, source)
+                if not absolute:
+                    continue
+                hit = replace(hit, url=absolute)
+            self._register(hit, source)
 
     def _should_register(self, url: str, kind: str) -> bool:
         if same_origin(url, self.domain):
@@ -255,9 +670,79 @@ class Crawler:
         path_url, params = normalize(hit.url)
         if not self._should_register(path_url, hit.kind):
             return
-        self.store.add(path_url, hit=hit, source=source, params=params)
+        with profiling.stage("store.add"):
+            self.store.add(path_url, hit=hit, source=source, params=params)
+        if self._page_hits is not None:
+            self._page_hits.append((path_url, hit, source, params))
 
     def _log(self, msg: str):
         if self.verbose:
             from color import dim, cyan
             print(f"  {dim('>')} {cyan(msg)}", file=sys.stderr)
+
+
+class AsyncCrawler(Crawler):
+    """Crawler that keeps up to ``concurrency`` page fetches in flight.
+
+    Fetches are issued from the head of the frontier on an asyncio loop, but
+    pages are parsed and expanded strictly in queue order, so the pages
+    visited and the resulting store are the same as the serial crawl.
+    """
+
+    def __init__(self, base_url: str, concurrency=8, **kwargs):
+        super().__init__(base_url, **kwargs)
+        self.concurrency = max(1, concurrency)
+        # Page fetches run alongside the script workers. A shared client is
+        # sized by its owner.
+        if self.shared is None:
+            self.client.add_threads(self.concurrency)
+
+    def _bfs(self):
+        if self.frontier is not None:
+            # Pages are claimed one at a time; run more processes on the same
+            # frontier for parallel page fetches.
+            return super()._bfs()
+        asyncio.run(self._bfs_async())
+
+    def _fetch_page(self, url: str) -> str | None:
+        html = self.client.get(url)
+        if html is not None:
+            self._start_parse(html)
+        return html
+
+    async def _bfs_async(self):
+        loop = asyncio.get_running_loop()
+        queue, seen_keys = self._start_queue()
+        inflight: deque[tuple[str, int, asyncio.Future]] = deque()
+        pool = ThreadPoolExecutor(max_workers=self.concurrency)
+
+        def unvisited():
+            return [(url, depth) for url, depth, _ in inflight] + list(queue)
+
+        try:
+            while queue or inflight:
+                if self._page_cap(seen_keys):
+                    break
+                if self._stopping() or self._low_yield():
+                    break
+                self._checkpoint(unvisited, seen_keys)
+                while queue and len(inflight) < self.concurrency:
+                    url, depth = queue.popleft()
+                    if depth > self.max_depth or self._skip(url):
+                        continue
+                    fut = loop.run_in_executor(pool, self._fetch_page, url)
+                    inflight.append((url, depth, fut))
+                if not inflight:
+                    break
+
+                url, depth, fut = inflight.popleft()
+                self._log(f"[depth={depth}] {url}")
+                html = await fut
+                if html is None:
+                    continue
+                self._visit(html, url, depth, queue, seen_keys)
+            self._checkpoint(unvisited, seen_keys, force=True)
+        finally:
+            for _, _, fut in inflight:
+                fut.cancel()
+            pool.shutdown(cancel_futures=True)
@@ -1,5 +1,16 @@
+from __future__ import annotations
+
+import time
+
+from profiling import stage
+
 from . import fetch, axios, xhr, jquery, angular, superagent, paths, graphql, rpc
+from .scan import BudgetExceeded, Scan
 from .html import (
+    BACKENDS as HTML_BACKENDS,
+    PageSignals,
+    parse_page,
+    extract_page,
     extract_forms,
     extract_data_urls,
     extract_script_srcs,
@@ -9,16 +20,41 @@ from .html import (
 
 _JS_EXTRACTORS = (fetch, axios, xhr, jquery, angular, superagent, paths, graphql, rpc)
 
+_ANCHORS = tuple(sorted({a for mod in _JS_EXTRACTORS for a in mod.ANCHORS}))
+
+_STAGES = tuple("extract." + mod.__name__.rsplit(".", 1)[-1] for mod in _JS_EXTRACTORS)
+
 
-def extract_from_js(js: str) -> list:
+def extract_from_js(js: str, budget: float | None = None) -> list:
+    """All extractors' hits in ``js``. With a ``budget`` in seconds, raises
+    BudgetExceeded once it is spent, with the hits of the extractors that
+    finished in its ``hits``."""
+    with stage("extract.scan", len(js)):
+        scan = Scan(js, _ANCHORS)
+    if budget is not None:
+        scan.deadline = time.monotonic() + budget
     hits = []
-    for mod in _JS_EXTRACTORS:
-        hits.extend(mod.extract(js))
+    for mod, name in zip(_JS_EXTRACTORS, _STAGES):
+        # An extractor can only hit where one of its anchors occurs.
+        if scan.seen(*mod.ANCHORS):
+            try:
+                if scan.deadline is not None and time.monotonic() > scan.deadline:
+                    raise BudgetExceeded
+                with stage(name, len(js)):
+                    hits.extend(mod.extract(js, scan))
+            except BudgetExceeded as e:
+                e.hits = hits
+                raise
     return hits
 
 
 __all__ = [
+    "BudgetExceeded",
+    "HTML_BACKENDS",
+    "PageSignals",
+    "parse_page",
     "extract_from_js",
+    "extract_page",
     "extract_forms",
     "extract_data_urls",
     "extract_script_srcs",
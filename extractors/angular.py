@@ -4,11 +4,18 @@ import re
 
 from models import Hit
 
+from .scan import Scan
+
+ANCHORS = ("$http", "this.http", "httpclient")
+
 _HTTP = re.compile(
     r"""(?:\$http|this\.http|httpClient)\s*\.\s*(get|post|put|patch|delete)\s*\(\s*[`"']([^`"']+)[`"']""",
     re.I,
 )
 
 
-def extract(js: str) -> list[Hit]:
-    return [Hit(url=m.group(2), method=m.group(1).upper()) for m in _HTTP.finditer(js)]
+def extract(js: str, scan: Scan | None = None) -> list[Hit]:
+    if scan is None:
+        scan = Scan(js, ANCHORS)
+    starts = scan.at("$http", "this.http", "httpclient")
+    return [Hit(url=m.group(2), method=m.group(1).upper()) for m in scan.finditer(_HTTP, starts)]
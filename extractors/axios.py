@@ -5,6 +5,10 @@ from urllib.parse import urlparse
 
 from models import Hit
 
+from .scan import Scan, SpanPattern, back_space, back_word
+
+ANCHORS = ("axios", ".create")
+
 # var e = n.create({ ..., baseURL: 'https://...' }) -- any obj.create, handles minified imports
 _CREATE = re.compile(
     r"""(\w+)\s*=\s*(?:\w+\.)+create\s*\([\s\S]{0,300}?baseURL\s*:\s*[`"'](https?://[^`"']+)[`"']""",
@@ -16,10 +20,11 @@ _CALL = re.compile(
     re.I,
 )
 
-_OBJ = re.compile(
-    r"""axios\s*\(\s*\{[^}]*?url\s*:\s*[`"']([^`"']+)[`"'][^}]*?method\s*:\s*[`"'](\w+)[`"']""",
-    re.I | re.S,
-)
+# axios({ ... url: '...' ... method: '...' }), matched as
+# axios\s*\(\s*\{ [^}]*? url... [^}]*? method... by SpanPattern.
+_OBJ_HEAD = re.compile(r"axios\s*\(\s*\{", re.I)
+_OBJ_URL = re.compile(r"""url\s*:\s*[`"']([^`"']+)[`"']""", re.I)
+_OBJ_METHOD = re.compile(r"""method\s*:\s*[`"'](\w+)[`"']""", re.I)
 
 
 def _join_base(base: str, path: str) -> str:
@@ -36,14 +41,61 @@ def _join_base(base: str, path: str) -> str:
     return base + "/" + path
 
 
-def extract(js: str) -> list[Hit]:
+def _create_starts(scan: Scan) -> list[int]:
+    """Offsets of the ``x`` in ``x = a.b.create(`` for each ``.create``."""
+    js = scan.js
+    out = []
+    prev_dot = prev_chain = -1
+    for dot in scan.at(".create"):
+        chain = dot
+        while chain > 0 and (js[chain - 1] == "." or js[chain - 1].isalnum() or js[chain - 1] == "_"):
+            chain -= 1
+            if chain == prev_dot:
+                # Same chain as the previous .create; don't walk it again.
+                chain = prev_chain
+                break
+        prev_dot, prev_chain = dot, chain
+        if chain == dot:
+            continue
+        eq = back_space(js, chain)
+        if eq == 0 or js[eq - 1] != "=":
+            continue
+        name_end = back_space(js, eq - 1)
+        name = back_word(js, name_end)
+        if name < name_end:
+            out.append(name)
+    return sorted(set(out))
+
+
+def _call_starts(scan: Scan) -> list[int]:
+    """Offsets of the ``x`` in ``x.get(`` for each call with a string argument."""
+    js = scan.js
+    out = []
+    for paren in scan.calls:
+        meth_end = back_space(js, paren)
+        meth = back_word(js, meth_end)
+        if meth == meth_end:
+            continue
+        dot = back_space(js, meth)
+        if dot == 0 or js[dot - 1] != ".":
+            continue
+        obj_end = back_space(js, dot - 1)
+        obj = back_word(js, obj_end)
+        if obj < obj_end:
+            out.append(obj)
+    return sorted(set(out))
+
+
+def extract(js: str, scan: Scan | None = None) -> list[Hit]:
+    if scan is None:
+        scan = Scan(js, ANCHORS)
     bases: dict[str, str] = {}
-    for m in _CREATE.finditer(js):
+    for m in scan.finditer(_CREATE, _create_starts(scan)):
         bases[m.group(1)] = m.group(2).rstrip("/")
 
     hits: list[Hit] = []
 
-    for m in _CALL.finditer(js):
+    for m in scan.finditer(_CALL, _call_starts(scan)):
         obj = m.group(1)
         method = m.group(2).upper()
         path = m.group(3)
@@ -54,7 +106,8 @@ def extract(js: str) -> list[Hit]:
         elif obj in bases:
             hits.append(Hit(url=_join_base(bases[obj], path), method=method_val))
 
-    for m in _OBJ.finditer(js):
+    obj = SpanPattern(js, _OBJ_HEAD, ("url", _OBJ_URL), ("method", _OBJ_METHOD))
+    for m in scan.finditer(obj, scan.at("axios")):
         hits.append(Hit(url=m.group(1), method=m.group(2).upper()))
 
     return hits
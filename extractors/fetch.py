@@ -4,16 +4,23 @@ import re
 
 from models import Hit
 
-_FETCH = re.compile(
-    r"""fetch\(\s*[`"']([^`"']+)[`"']"""
-    r"""(?:\s*,\s*\{[^}]*?method\s*:\s*[`"'](\w+)[`"'])?""",
-    re.I,
-)
+from .scan import FirstOf, Scan, SpanPattern
 
+ANCHORS = ("fetch",)
 
-def extract(js: str) -> list[Hit]:
+# fetch('...', { ... method: '...' }) with the options object optional; the
+# empty group stands in for the method when it is absent.
+_FETCH_OPTS = re.compile(r"""fetch\(\s*[`"']([^`"']+)[`"']\s*,\s*\{""", re.I)
+_FETCH_METHOD = re.compile(r"""method\s*:\s*[`"'](\w+)[`"']""", re.I)
+_FETCH = re.compile(r"""fetch\(\s*[`"']([^`"']+)[`"']()""", re.I)
+
+
+def extract(js: str, scan: Scan | None = None) -> list[Hit]:
+    if scan is None:
+        scan = Scan(js, ANCHORS)
     hits = []
-    for m in _FETCH.finditer(js):
+    pattern = FirstOf(SpanPattern(js, _FETCH_OPTS, ("method", _FETCH_METHOD)), _FETCH)
+    for m in scan.finditer(pattern, scan.at("fetch")):
         method = (m.group(2) or "").upper() or None
         hits.append(Hit(url=m.group(1), method=method))
     return hits
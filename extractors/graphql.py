@@ -4,6 +4,14 @@ import re
 
 from models import Hit
 
+from .scan import Scan
+
+ANCHORS = (
+    "request", "gqlrequest", "gql", "graphql", "client",
+    "usequery", "usemutation", "usesubscription", "uselazyquery",
+    "query", "mutation", "subscription", "/graphql", "/gql", "/query",
+)
+
 _GQL_ENDPOINT = re.compile(
     r"""[`"']((?:https?://[^`"'\s]*)?/(?:graphql|api/graphql|gql|query))[`"']""",
     re.I,
@@ -37,10 +45,12 @@ _REQUEST = re.compile(
 _APOLLO_METHOD_MAP = {"query": "query", "mutate": "mutation", "subscribe": "subscription"}
 
 
-def extract(js: str) -> list[Hit]:
+def extract(js: str, scan: Scan | None = None) -> list[Hit]:
+    if scan is None:
+        scan = Scan(js, ANCHORS)
     hits = []
 
-    for m in _REQUEST.finditer(js):
+    for m in scan.finditer(_REQUEST, scan.at("request", "gqlrequest")):
         hits.append(Hit(
             url=m.group(1),
             kind="graphql",
@@ -49,7 +59,7 @@ def extract(js: str) -> list[Hit]:
             gql_op_name=m.group(3) or None,
         ))
 
-    for m in _GQL_TEMPLATE.finditer(js):
+    for m in scan.finditer(_GQL_TEMPLATE, scan.at("gql", "graphql")):
         hits.append(Hit(
             url="__graphql__",
             kind="graphql",
@@ -58,7 +68,7 @@ def extract(js: str) -> list[Hit]:
             gql_op_name=m.group(2) or None,
         ))
 
-    for m in _GQL_STRING.finditer(js):
+    for m in scan.finditer(_GQL_STRING, scan.literals_with("query", "mutation", "subscription")):
         hits.append(Hit(
             url="__graphql__",
             kind="graphql",
@@ -67,16 +77,17 @@ def extract(js: str) -> list[Hit]:
             gql_op_name=m.group(2) or None,
         ))
 
-    for m in _APOLLO_OP.finditer(js):
+    for m in scan.finditer(_APOLLO_OP, scan.at("client")):
         op = _APOLLO_METHOD_MAP.get(m.group(1).lower(), "query")
         hits.append(Hit(url="__graphql__", kind="graphql", method="POST", gql_op_type=op))
 
-    for m in _HOOKS.finditer(js):
+    hooks = scan.at("usequery", "usemutation", "usesubscription", "uselazyquery")
+    for m in scan.finditer(_HOOKS, hooks):
         hook = m.group(1).lower()
         op = "mutation" if "mutation" in hook else "subscription" if "subscription" in hook else "query"
         hits.append(Hit(url="__graphql__", kind="graphql", method="POST", gql_op_type=op))
 
-    for m in _GQL_ENDPOINT.finditer(js):
+    for m in scan.finditer(_GQL_ENDPOINT, scan.literals_with("/graphql", "/gql", "/query")):
         hits.append(Hit(url=m.group(1), kind="graphql", method="POST"))
 
     return hits
@@ -1,7 +1,41 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
 from urllib.parse import urljoin, urlparse, urlunparse
 
 from bs4 import BeautifulSoup
 
+from profiling import stage
+
+try:
+    from lxml import etree
+    _BS_PARSER = "lxml"
+except ImportError:
+    etree = None
+    _BS_PARSER = "html.parser"
+
+
+@dataclass
+class PageSignals:
+    """Everything the crawler reads from one HTML document, with attribute
+    values still as written so the result can be reused for an identical body
+    served under another URL."""
+    forms: list = field(default_factory=list)
+    data_urls: list = field(default_factory=list)
+    script_srcs: list = field(default_factory=list)
+    inline_js: list = field(default_factory=list)
+    links: list = field(default_factory=list)
+
+    def resolved(self, page_url: str) -> PageSignals:
+        base = _dir_url(page_url)
+        return PageSignals(
+            forms=[(urljoin(base, action), method) for action, method in self.forms],
+            data_urls=[urljoin(base, u) for u in self.data_urls],
+            script_srcs=[urljoin(base, s) for s in self.script_srcs],
+            inline_js=self.inline_js,
+            links=[_link(base, href) for href in self.links],
+        )
+
 
 def _dir_url(url: str) -> str:
     p = urlparse(url)
@@ -11,14 +45,121 @@ def _dir_url(url: str) -> str:
     return urlunparse(p)
 
 
+def _link(base: str, href: str) -> str:
+    return urljoin(base, href).split("#")[0].split("?")[0]
+
+
+def _form_values(soup: BeautifulSoup) -> list[tuple[str, str]]:
+    return [(form["action"], form.get("method", "GET").upper())
+            for form in soup.find_all("form", action=True)]
+
+
+def _data_values(soup: BeautifulSoup) -> list[str]:
+    return ([tag["data-url"] for tag in soup.find_all(True, attrs={"data-url": True})]
+            + [tag["data-endpoint"] for tag in soup.find_all(True, attrs={"data-endpoint": True})])
+
+
+def _src_values(soup: BeautifulSoup) -> list[str]:
+    return [t["src"] for t in soup.find_all("script", src=True)]
+
+
+def _href_values(soup: BeautifulSoup) -> list[str]:
+    return [tag["href"] for tag in soup.find_all("a", href=True)]
+
+
+def extract_page(soup: BeautifulSoup) -> PageSignals:
+    return PageSignals(
+        forms=_form_values(soup),
+        data_urls=_data_values(soup),
+        script_srcs=_src_values(soup),
+        inline_js=[str(js) for js in extract_inline_js(soup)],
+        links=_href_values(soup),
+    )
+
+
+class _Collector:
+    """lxml parser target that collects PageSignals from the parse events,
+    which is how BeautifulSoup's lxml builder reads the document too. A tree
+    built by lxml itself ends where the root element closes and drops what
+    follows (scripts appended after </html>, a second document); the event
+    stream still reports it."""
+
+    def __init__(self):
+        self.page = PageSignals()
+        self._endpoints: list[str] = []
+        # Text of the inline script being read, if any.
+        self._script: list[str] | None = None
+
+    def start(self, tag, attrib):
+        page = self.page
+        if attrib:
+            if "data-url" in attrib:
+                page.data_urls.append(attrib["data-url"])
+            if "data-endpoint" in attrib:
+                self._endpoints.append(attrib["data-endpoint"])
+        if tag == "a":
+            if "href" in attrib:
+                page.links.append(attrib["href"])
+        elif tag == "script":
+            if "src" in attrib:
+                page.script_srcs.append(attrib["src"])
+            else:
+                self._script = []
+        elif tag == "form" and "action" in attrib:
+            page.forms.append((attrib["action"], attrib.get("method", "GET").upper()))
+
+    def data(self, text):
+        if self._script is not None:
+            self._script.append(text)
+
+    def end(self, tag):
+        if tag == "script" and self._script is not None:
+            js = "".join(self._script)
+            if js:
+                self.page.inline_js.append(js)
+            self._script = None
+
+    def close(self) -> PageSignals:
+        self.page.data_urls += self._endpoints
+        return self.page
+
+
+def _lxml_page(html: str) -> PageSignals:
+    """Collect every signal in a single pass of lxml's parser, without
+    building a BeautifulSoup tree. Same parser and the same events as
+    BeautifulSoup's lxml builder, so the same signals."""
+    parser = etree.HTMLParser(no_network=True, target=_Collector())
+    parser.feed(html)
+    return parser.close()
+
+
+def _bs4_page(html: str) -> PageSignals:
+    return extract_page(BeautifulSoup(html, _BS_PARSER))
+
+
+BACKENDS = {"bs4": _bs4_page}
+if etree is not None:
+    BACKENDS["lxml"] = _lxml_page
+
+
+def parse_page(html: str, backend: str = "auto") -> PageSignals:
+    """Parse an HTML document into PageSignals. ``auto`` uses lxml directly
+    when it is installed, BeautifulSoup otherwise or for input lxml rejects."""
+    if backend == "auto":
+        backend = "lxml" if "lxml" in BACKENDS else "bs4"
+    with stage("html.parse", len(html)):
+        if backend == "lxml":
+            try:
+                return _lxml_page(html)
+            except (ValueError, etree.LxmlError):
+                # e.g. a str carrying an XML encoding declaration
+                return _bs4_page(html)
+        return BACKENDS[backend](html)
+
+
 def extract_forms(soup: BeautifulSoup, page_url: str) -> list[tuple[str, str]]:
     base = _dir_url(page_url)
-    results = []
-    for form in soup.find_all("form", action=True):
-        url = urljoin(base, form["action"])
-        method = form.get("method", "GET").upper()
-        results.append((url, method))
-    return results
+    return [(urljoin(base, action), method) for action, method in _form_values(soup)]
 
 
 def extract_data_urls(soup: BeautifulSoup, page_url: str) -> list[str]:
@@ -26,17 +167,12 @@ def extract_data_urls(soup: BeautifulSoup, page_url: str) -> list[str]:
     data-href is intentionally excluded — it is a navigation attribute,
     not an API endpoint signal."""
     base = _dir_url(page_url)
-    results = []
-    for tag in soup.find_all(True, attrs={"data-url": True}):
-        results.append(urljoin(base, tag["data-url"]))
-    for tag in soup.find_all(True, attrs={"data-endpoint": True}):
-        results.append(urljoin(base, tag["data-endpoint"]))
-    return results
+    return [urljoin(base, u) for u in _data_values(soup)]
 
 
 def extract_script_srcs(soup: BeautifulSoup, page_url: str) -> list[str]:
     base = _dir_url(page_url)
-    return [urljoin(base, t["src"]) for t in soup.find_all("script", src=True)]
+    return [urljoin(base, s) for s in _src_values(soup)]
 
 
 def extract_inline_js(soup: BeautifulSoup) -> list[str]:
@@ -45,7 +181,4 @@ def extract_inline_js(soup: BeautifulSoup) -> list[str]:
 
 def extract_links(soup: BeautifulSoup, page_url: str) -> list[str]:
     base = _dir_url(page_url)
-    out = []
-    for tag in soup.find_all("a", href=True):
-        out.append(urljoin(base, tag["href"]).split("#")[0].split("?")[0])
-    return out
+    return [_link(base, href) for href in _href_values(soup)]
@@ -4,10 +4,14 @@ import re
 
 from models import Hit
 
-_AJAX = re.compile(
-    r"""\$\.\s*ajax\s*\(\s*\{[^}]*?url\s*:\s*[`"']([^`"']+)[`"'][^}]*?(?:type|method)\s*:\s*[`"'](\w+)[`"']""",
-    re.I | re.S,
-)
+from .scan import Scan, SpanPattern
+
+ANCHORS = ("$.",)
+
+# $.ajax({ ... url: '...' ... type|method: '...' }), matched by SpanPattern.
+_AJAX_HEAD = re.compile(r"\$\.\s*ajax\s*\(\s*\{", re.I)
+_AJAX_URL = re.compile(r"""url\s*:\s*[`"']([^`"']+)[`"']""", re.I)
+_AJAX_METHOD = re.compile(r"""(?:type|method)\s*:\s*[`"'](\w+)[`"']""", re.I)
 _SHORT = re.compile(
     r"""\$\.\s*(get|post|getJSON|put|delete)\s*\(\s*[`"']([^`"']+)[`"']""",
     re.I,
@@ -15,10 +19,13 @@ _SHORT = re.compile(
 _METHOD_MAP = {"get": "GET", "post": "POST", "getjson": "GET", "put": "PUT", "delete": "DELETE"}
 
 
-def extract(js: str) -> list[Hit]:
+def extract(js: str, scan: Scan | None = None) -> list[Hit]:
+    if scan is None:
+        scan = Scan(js, ANCHORS)
     hits = []
-    for m in _AJAX.finditer(js):
+    ajax = SpanPattern(js, _AJAX_HEAD, ("url", _AJAX_URL), ("type|method", _AJAX_METHOD))
+    for m in scan.finditer(ajax, scan.at("$.")):
         hits.append(Hit(url=m.group(1), method=m.group(2).upper()))
-    for m in _SHORT.finditer(js):
+    for m in scan.finditer(_SHORT, scan.at("$.")):
         hits.append(Hit(url=m.group(2), method=_METHOD_MAP.get(m.group(1).lower())))
     return hits
@@ -5,15 +5,50 @@ from urllib.parse import urlparse
 
 from models import Hit
 
-_ABS = re.compile(
-    r"""[`"'](https?://[^`"'\s<>{}]+/[a-zA-Z0-9_./-]+)[`"']""",
-    re.I,
-)
+from .scan import Checked, Scan
 
-_REL = re.compile(
-    r"""[`"']((?:/[a-zA-Z0-9_.-]+){1,}/(?:api|v\d+|rest|oauth|token|auth|graphql|rpc)/[^`"'\s{}<>]*)[`"']""",
-    re.I,
-)
+_ABS_ANCHORS = ("http",)
+_REL_ANCHORS = ("/api/", "/v", "/rest/", "/oauth/", "/token/", "/auth/", "/graphql/", "/rpc/")
+ANCHORS = _ABS_ANCHORS + _REL_ANCHORS
+
+# Both patterns stand for longer regexes that backtrack quadratically on an
+# unterminated literal. Each takes the whole literal body in one step, the
+# (?=(...))\2 idiom keeping re from giving any of it back, and the _ok check
+# then decides whether the original pattern could have split it:
+#   _ABS  [`"'](https?://[^`"'\s<>{}]+/[a-zA-Z0-9_./-]+)[`"']
+#   _REL  [`"']((?:/[a-zA-Z0-9_.-]+){1,}/(?:api|v\d+|...|rpc)/[^`"'\s{}<>]*)[`"']
+_ABS_BODY = re.compile(r"""[`"'](https?://(?=([^`"'\s<>{}]+))\2)[`"']""", re.I)
+_REL_BODY = re.compile(r"""[`"']((?=(/[^`"'\s{}<>]*))\2)[`"']""", re.I)
+
+_PATH_CHARS = re.compile(r"[a-zA-Z0-9_./-]*", re.I)
+_SEGMENTS = re.compile(r"(?:/[a-zA-Z0-9_.-]+)+", re.I)
+_API_DIR = re.compile(r"/(?:api|v\d+|rest|oauth|token|auth|graphql|rpc)/", re.I)
+
+
+def _abs_ok(m: re.Match) -> bool:
+    """Some '/' after the host's first character is followed only by path characters."""
+    rest = m.group(2)
+    n = len(rest)
+    tail = n - _PATH_CHARS.match(rest[::-1]).end()
+    return rest.find("/", max(tail, 1), n - 1) >= 0
+
+
+def _rel_ok(m: re.Match) -> bool:
+    """Some /api/-style directory follows a run of whole /segments."""
+    path = m.group(1)
+    segs = _SEGMENTS.match(path)
+    if segs is None:
+        return False
+    i = path.find("/", 1)
+    while 0 < i <= segs.end():
+        if _API_DIR.match(path, i):
+            return True
+        i = path.find("/", i + 1)
+    return False
+
+
+_ABS = Checked(_ABS_BODY, _abs_ok)
+_REL = Checked(_REL_BODY, _rel_ok)
 
 _SKIP_EXT = re.compile(
     r"\.(?:js|css|html|htm|png|jpg|jpeg|gif|svg|ico|woff2?|ttf|eot|map|pdf|docx?|zip|tar|gz)(?:[?#]|$)",
@@ -51,9 +86,11 @@ def _is_noise(url: str) -> bool:
     return host in _NOISE_DOMAINS
 
 
-def extract(js: str) -> list[Hit]:
+def extract(js: str, scan: Scan | None = None) -> list[Hit]:
+    if scan is None:
+        scan = Scan(js, ANCHORS)
     hits: list[Hit] = []
-    for m in _ABS.finditer(js):
+    for m in scan.finditer(_ABS, scan.literals_with(*_ABS_ANCHORS)):
         url = m.group(1)
         if _SKIP_EXT.search(url):
             continue
@@ -64,6 +101,6 @@ def extract(js: str) -> list[Hit]:
         if not _ABS_API_SIGNAL_RE.search(url):
             continue
         hits.append(Hit(url=url))
-    for m in _REL.finditer(js):
+    for m in scan.finditer(_REL, scan.literals_with(*_REL_ANCHORS)):
         hits.append(Hit(url=m.group(1)))
     return hits
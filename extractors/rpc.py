@@ -4,12 +4,20 @@ import re
 
 from models import Hit
 
-_JSONRPC_METHOD = re.compile(
-    r"""(?:jsonrpc|json_rpc)[^}]*?method\s*:\s*[`"']([^`"']+)[`"']"""
-    r"""|method\s*:\s*[`"']([^`"']+)[`"'][^}]*?jsonrpc""",
-    re.I | re.S,
+from .scan import LITERAL, FirstOf, Scan, SpanPattern
+
+ANCHORS = (
+    "jsonrpc", "json_rpc", "method", "trpc", "api", "socket.", "rpc",
+    # gRPC-web paths have no fixed text; any URL-shaped literal may hold one.
+    LITERAL,
 )
 
+# jsonrpc ... method: '...' or method: '...' ... jsonrpc, within one object;
+# matched by SpanPattern, group 1 is the method either way.
+_JSONRPC_KEY = re.compile(r"jsonrpc|json_rpc", re.I)
+_RPC_METHOD = re.compile(r"""method\s*:\s*[`"']([^`"']+)[`"']""", re.I)
+_JSONRPC = re.compile(r"jsonrpc", re.I)
+
 _JSONRPC_ENDPOINT = re.compile(
     r"""[`"']((?:https?://[^`"'\s]*)?/(?:jsonrpc|json[_-]rpc|rpc))[`"']""",
     re.I,
@@ -43,33 +51,38 @@ _TRPC_OP_MAP = {"query": "query", "mutate": "mutation", "subscribe": "subscripti
 _HOOK_OP_MAP = {"query": "query", "mutation": "mutation", "subscription": "subscription"}
 
 
-def extract(js: str) -> list[Hit]:
+def extract(js: str, scan: Scan | None = None) -> list[Hit]:
+    if scan is None:
+        scan = Scan(js, ANCHORS)
     hits = []
 
-    for m in _JSONRPC_METHOD.finditer(js):
-        method_name = m.group(1) or m.group(2)
-        hits.append(Hit(url="__jsonrpc__", kind="rpc", method="POST", rpc_method=method_name))
+    jsonrpc_method = FirstOf(
+        SpanPattern(js, _JSONRPC_KEY, ("method", _RPC_METHOD)),
+        SpanPattern(js, _RPC_METHOD, ("jsonrpc", _JSONRPC)),
+    )
+    for m in scan.finditer(jsonrpc_method, scan.at("jsonrpc", "json_rpc", "method")):
+        hits.append(Hit(url="__jsonrpc__", kind="rpc", method="POST", rpc_method=m.group(1)))
 
-    for m in _JSONRPC_ENDPOINT.finditer(js):
+    for m in scan.finditer(_JSONRPC_ENDPOINT, scan.literals_with("rpc")):
         hits.append(Hit(url=m.group(1), kind="rpc", method="POST"))
 
-    for m in _TRPC_CALL.finditer(js):
+    for m in scan.finditer(_TRPC_CALL, scan.at("trpc")):
         proc = m.group(1)
         op = _TRPC_OP_MAP.get(m.group(2).lower(), "query")
         hits.append(Hit(url="__trpc__", kind="rpc", method="POST", rpc_method=f"{proc}.{op}"))
 
-    for m in _TRPC_HOOK.finditer(js):
+    for m in scan.finditer(_TRPC_HOOK, scan.at("api", "trpc")):
         proc = m.group(1)
         op = _HOOK_OP_MAP.get(m.group(2).lower(), "query")
         hits.append(Hit(url="__trpc__", kind="rpc", method="POST", rpc_method=f"{proc}.{op}"))
 
-    for m in _GRPC_URL.finditer(js):
+    for m in scan.finditer(_GRPC_URL, scan.literals):
         hits.append(Hit(url=m.group(1), kind="rpc", method="POST"))
 
-    for m in _SOCKETIO_EMIT.finditer(js):
+    for m in scan.finditer(_SOCKETIO_EMIT, scan.at("socket.")):
         hits.append(Hit(url="__socketio__", kind="rpc", rpc_method=f"emit:{m.group(1)}"))
 
-    for m in _SOCKETIO_ON.finditer(js):
+    for m in scan.finditer(_SOCKETIO_ON, scan.at("socket.")):
         hits.append(Hit(url="__socketio__", kind="rpc", rpc_method=f"on:{m.group(1)}"))
 
     return hits
@@ -0,0 +1,294 @@
+from __future__ import annotations
+
+import re
+import time
+from bisect import bisect_left
+from functools import lru_cache
+from heapq import merge
+from typing import Iterable, Iterator
+
+# Stands for "a URL-shaped string literal" in an extractor's ANCHORS, for
+# patterns that have no fixed text of their own to anchor on.
+LITERAL = "<literal>"
+
+# A quote opening a literal that holds a '/' before any whitespace, or that
+# starts with a GraphQL operation keyword. The body is consumed so the match
+# end marks the closing quote; a body never contains a quote, so no opening
+# is skipped.
+_LITERAL = re.compile(r"""[`"'](?=[^`"'\s]*/|\s*(?:query|mutation|subscription)\s)[^`"']*""")
+
+# A '(' whose first argument is a string literal.
+_CALL = re.compile(r"""\((?=\s*[`"'])""")
+
+
+class BudgetExceeded(Exception):
+    """Raised from ``Scan.finditer`` once the scan's deadline has passed."""
+
+
+def _trie(words) -> str:
+    """Regex source matching any of ``words``, factored into a prefix tree so
+    each offset is tested against one branch rather than every word."""
+    root: dict = {}
+    for w in words:
+        node = root
+        for ch in w:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def build(node) -> str:
+        alts = [re.escape(ch) + build(sub) for ch, sub in sorted(node.items()) if ch]
+        if not alts:
+            return ""
+        body = alts[0] if len(alts) == 1 else "(?:%s)" % "|".join(alts)
+        return "(?:%s)?" % body if "" in node else body
+
+    return build(root)
+
+
+def _overlaps(tokens) -> dict[str, tuple[tuple[int, str], ...]]:
+    """For each token, the (offset, token) pairs that may start inside it,
+    e.g. ``httpclient`` at offset 5 of ``this.httpclient``."""
+    table = {}
+    for a in tokens:
+        found = []
+        for off in range(len(a)):
+            for b in tokens:
+                if b == a and off == 0:
+                    continue
+                n = min(len(a) - off, len(b))
+                if a[off:off + n] == b[:n]:
+                    found.append((off, b))
+        table[a] = tuple(found)
+    return table
+
+
+@lru_cache(maxsize=None)
+def _anchor_pass(anchors: tuple[str, ...]):
+    words = [a for a in anchors if a != LITERAL]
+    if not words:
+        return None, {}
+    return re.compile(_trie(words)), _overlaps(words)
+
+
+def _fold(js: str) -> str:
+    """Lower-case ``js`` the way re.IGNORECASE compares, keeping its length."""
+    if js.isascii():
+        return js.lower()
+    # U+0130 is the only character whose full lower-case mapping is longer
+    # than one code point; the other two fold to ASCII under re.I.
+    low = js.replace("İ", "i").lower()
+    return low.replace("ı", "i").replace("ſ", "s")
+
+
+def back_space(js: str, i: int) -> int:
+    """Return the start of the whitespace run ending at ``i``."""
+    while i > 0 and js[i - 1].isspace():
+        i -= 1
+    return i
+
+
+def back_word(js: str, i: int) -> int:
+    """Return the start of the ``\\w`` run ending at ``i``."""
+    while i > 0 and (js[i - 1].isalnum() or js[i - 1] == "_"):
+        i -= 1
+    return i
+
+
+class Scan:
+    """Sites of interest in a JS source, found once and shared by every extractor.
+
+    ``literals`` holds the opening quote of each string or template literal
+    that can carry a URL or GraphQL document, ``calls`` the ``(`` of each call
+    whose first argument is a string literal, and ``at()`` the offsets of the
+    extractors' anchor literals, all found in a single multi-literal pass.
+    Extractors match their patterns only at these offsets (see ``finditer``)
+    instead of each running several full ``finditer`` passes over the file.
+    """
+
+    def __init__(self, js: str, anchors):
+        self.js = js
+        # time.monotonic() after which finditer raises BudgetExceeded.
+        self.deadline: float | None = None
+        anchors = tuple(sorted(set(anchors)))
+        self._found: dict[str, list[int]] = {a: [] for a in anchors if a != LITERAL}
+
+        # Separate patterns rather than one alternation: each starts with a
+        # fixed character set, which lets re skip ahead without trying every
+        # offset, and together they run several times faster.
+        low = _fold(js)
+        self.literals: list[int] = []
+        self._literal_ends: list[int] = []
+        for m in _LITERAL.finditer(low):
+            self.literals.append(m.start())
+            self._literal_ends.append(m.end())
+        self.calls = [m.start() for m in _CALL.finditer(low)]
+
+        pattern, overlaps = _anchor_pass(anchors)
+        if pattern is None:
+            return
+        found = self._found
+        for m in pattern.finditer(low):
+            pos = m.start()
+            word = m.group()
+            found[word].append(pos)
+            # The pass is non-overlapping; pick up anchors starting inside this one.
+            for off, other in overlaps[word]:
+                if low.startswith(other, pos + off):
+                    found[other].append(pos + off)
+
+    def at(self, *anchors: str) -> Iterable[int]:
+        """Ascending offsets where any of ``anchors`` occurs."""
+        if len(anchors) == 1:
+            return self._found[anchors[0]]
+        return merge(*(self._found[a] for a in anchors))
+
+    def seen(self, *anchors: str) -> bool:
+        """Whether any of ``anchors`` occurs anywhere in the source."""
+        return any(self.literals if a == LITERAL else self._found[a] for a in anchors)
+
+    def literals_with(self, *anchors: str) -> list[int]:
+        """Openings of literals whose body contains one of ``anchors``."""
+        lists = [(self._found[a], len(a)) for a in anchors if self._found[a]]
+        out = []
+        for start, end in zip(self.literals, self._literal_ends):
+            for found, n in lists:
+                i = bisect_left(found, start + 1)
+                if i < len(found) and found[i] + n <= end:
+                    out.append(start)
+                    break
+        return out
+
+    def finditer(self, pattern: re.Pattern, starts: Iterable[int]) -> Iterator[re.Match]:
+        """Same matches as ``pattern.finditer(js)``, trying only ``starts``.
+
+        ``starts`` must be ascending and include every offset at which
+        ``pattern`` can match; ``pattern`` must not match the empty string.
+        """
+        js = self.js
+        end = tried = -1
+        deadline = self.deadline
+        for n, pos in enumerate(starts):
+            if deadline is not None and not n & 255 and time.monotonic() > deadline:
+                raise BudgetExceeded
+            if pos < end:
+                # Inside the previous match: finditer resumes at its end.
+                if tried == end:
+                    continue
+                pos = tried = end
+            m = pattern.match(js, pos)
+            if m:
+                yield m
+                end = m.end()
+
+
+class LazySpan:
+    """Linear-time stand-in for ``[^}]*?`` followed by ``pattern``: the first
+    match of ``pattern`` starting between a position and the next ``}``.
+
+    Only offsets where ``head`` (a regex for the text ``pattern`` starts
+    with) matches are tried. A failed search is remembered for the rest of
+    its span, so searches at ascending positions inside one long run without
+    a ``}`` cost a single pass over it, not one pass each.
+    """
+
+    def __init__(self, js: str, head: str, pattern: re.Pattern):
+        self.js = js
+        self._head = re.compile(head, pattern.flags & re.I)
+        self._pattern = pattern
+        self._pos = self._end = self._dead = -1
+
+    def search(self, pos: int) -> re.Match | None:
+        js = self.js
+        if not self._pos <= pos <= self._end:
+            end = js.find("}", pos)
+            self._end = len(js) if end < 0 else end
+            self._dead = self._end + 1
+        self._pos = pos
+        if pos >= self._dead:
+            return None
+        for h in self._head.finditer(js, pos, self._end):
+            m = self._pattern.match(js, h.start())
+            if m:
+                return m
+        self._dead = pos
+        return None
+
+
+class SpanMatch:
+    __slots__ = ("_groups", "_end")
+
+    def __init__(self, groups: tuple, end: int):
+        self._groups = groups
+        self._end = end
+
+    def group(self, i: int):
+        return self._groups[i - 1]
+
+    def end(self) -> int:
+        return self._end
+
+
+class SpanPattern:
+    """Matches ``head [^}]*? p1 [^}]*? p2 ...`` in ``js`` without the
+    backtracking that pattern costs as one regex, where each lazy span can
+    be retried once per position of the one before it.
+
+    ``parts`` are ``(head, pattern)`` pairs as taken by ``LazySpan``. Groups
+    are numbered across ``head`` and the parts as in the combined regex, and
+    ``match`` fits ``Scan.finditer``.
+    """
+
+    def __init__(self, js: str, head: re.Pattern, *parts: tuple[str, re.Pattern]):
+        self._head = head
+        self._spans = [LazySpan(js, h, p) for h, p in parts]
+
+    def match(self, js: str, pos: int) -> SpanMatch | None:
+        h = self._head.match(js, pos)
+        if h is None:
+            return None
+        found = self._chain(h.end(), 0)
+        if found is None:
+            return None
+        groups = h.groups() + tuple(g for m in found for g in m.groups())
+        return SpanMatch(groups, found[-1].end() if found else h.end())
+
+    def _chain(self, pos: int, i: int) -> list[re.Match] | None:
+        if i == len(self._spans):
+            return []
+        span = self._spans[i]
+        while True:
+            m = span.search(pos)
+            if m is None:
+                return None
+            rest = self._chain(m.end(), i + 1)
+            if rest is not None:
+                return [m] + rest
+            pos = m.start() + 1
+
+
+class Checked:
+    """``pattern``, keeping only matches that pass ``check``. Lets a pattern
+    match greedily without backtracking and leave the part it can no longer
+    express to plain code."""
+
+    def __init__(self, pattern: re.Pattern, check):
+        self._pattern = pattern
+        self._check = check
+
+    def match(self, js: str, pos: int) -> re.Match | None:
+        m = self._pattern.match(js, pos)
+        return m if m and self._check(m) else None
+
+
+class FirstOf:
+    """The first of ``patterns`` to match at a position, like an alternation."""
+
+    def __init__(self, *patterns):
+        self._patterns = patterns
+
+    def match(self, js: str, pos: int):
+        for p in self._patterns:
+            m = p.match(js, pos)
+            if m:
+                return m
+        return None
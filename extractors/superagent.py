@@ -4,11 +4,20 @@ import re
 
 from models import Hit
 
+from .scan import Scan
+
+ANCHORS = ("superagent",)
+
 _SA = re.compile(
     r"""superagent\s*\.\s*(get|post|put|patch|delete)\s*\(\s*[`"']([^`"']+)[`"']""",
     re.I,
 )
 
 
-def extract(js: str) -> list[Hit]:
-    return [Hit(url=m.group(2), method=m.group(1).upper()) for m in _SA.finditer(js)]
+def extract(js: str, scan: Scan | None = None) -> list[Hit]:
+    if scan is None:
+        scan = Scan(js, ANCHORS)
+    return [
+        Hit(url=m.group(2), method=m.group(1).upper())
+        for m in scan.finditer(_SA, scan.at("superagent"))
+    ]
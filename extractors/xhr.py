@@ -4,15 +4,21 @@ import re
 
 from models import Hit, HTTP_METHODS
 
+from .scan import Scan
+
+ANCHORS = (".open",)
+
 _XHR = re.compile(
     r"""\.open\(\s*[`"'](\w+)[`"']\s*,\s*[`"']([^`"']+)[`"']""",
     re.I,
 )
 
 
-def extract(js: str) -> list[Hit]:
+def extract(js: str, scan: Scan | None = None) -> list[Hit]:
+    if scan is None:
+        scan = Scan(js, ANCHORS)
     hits = []
-    for m in _XHR.finditer(js):
+    for m in scan.finditer(_XHR, scan.at(".open")):
         method = m.group(1).upper()
         hits.append(Hit(url=m.group(2), method=method if method in HTTP_METHODS else None))
     return hits
@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import sys
+
+DEFAULT_DB = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fingerprints.json")
+
+# Banners are only looked for this far into a file.
+_HEAD = 1024
+
+_SOURCEMAP_RE = re.compile(r"\s*//[#@] sourceMappingURL=\S*\s*$")
+
+
+def content_hash(js: str) -> str:
+    """Digest of ``js`` ignoring a trailing source map comment and whitespace,
+    which differ between otherwise identical self-hosted copies."""
+    tail = _SOURCEMAP_RE.search(js, max(0, len(js) - 512))
+    if tail:
+        js = js[:tail.start()]
+    js = js.rstrip()
+    return hashlib.blake2b(js.encode("utf-8", "surrogatepass"), digest_size=16).hexdigest()
+
+
+class Fingerprints:
+    """Banner signatures and content hashes of known library files.
+
+    A banner matches only within the first kilobyte of a file no longer
+    than the banner's ``max_len``, so an app bundle that merely starts with
+    a vendor licence header is not mistaken for the library itself.
+    """
+
+    def __init__(self, banners: list[dict] | None = None, hashes: dict[str, str] | None = None):
+        self.banners = banners or []
+        self.hashes = hashes or {}
+        self._compiled = [(b["name"], re.compile(b["pattern"]), b["max_len"]) for b in self.banners]
+
+    @classmethod
+    def load(cls, path: str = DEFAULT_DB) -> Fingerprints:
+        with open(path) as f:
+            raw = json.load(f)
+        return cls(raw.get("banners"), raw.get("hashes"))
+
+    def save(self, path: str):
+        with open(path, "w") as f:
+            json.dump({"banners": self.banners, "hashes": dict(sorted(self.hashes.items()))},
+                      f, indent=2)
+            f.write("\n")
+
+    def match(self, js: str) -> str | None:
+        """Name of the library ``js`` is a copy of, or None."""
+        head = js[:_HEAD]
+        for name, pattern, max_len in self._compiled:
+            if len(js) <= max_len and pattern.search(head):
+                return name
+        return self.hashes.get(content_hash(js))
+
+
+def _read(path: str) -> str:
+    with open(path, "rb") as f:
+        return f.read().decode("utf-8", errors="replace")
+
+
+def main(argv=None):
+    p = argparse.ArgumentParser(prog="fingerprints", description="Manage known-library fingerprints.")
+    sub = p.add_subparsers(dest="cmd", required=True)
+    add = sub.add_parser("add", help="Add content hashes of local library files to a database")
+    add.add_argument("--fingerprints", "--db", dest="db", metavar="FILE", required=True,
+                     help="Database to add to, as passed to apipie --fingerprints; created from the "
+                          "bundled one if missing (the bundled file itself is not modified)")
+    add.add_argument("name", help="Library name and version, e.g. jquery-3.7.1")
+    add.add_argument("files", nargs="+")
+    check = sub.add_parser("check", help="Show which files match a fingerprint")
+    check.add_argument("--fingerprints", "--db", dest="db", metavar="FILE", default=DEFAULT_DB,
+                       help="Database to match against (default: bundled fingerprints.json)")
+    check.add_argument("files", nargs="+")
+    args = p.parse_args(argv)
+
+    if args.cmd == "add":
+        if os.path.exists(args.db) and os.path.samefile(args.db, DEFAULT_DB):
+            p.error("the bundled database is not modified; pass your own --fingerprints FILE")
+        db = Fingerprints.load(args.db if os.path.exists(args.db) else DEFAULT_DB)
+        for path in args.files:
+            h = content_hash(_read(path))
+            db.hashes[h] = args.name
+            print(f"{h}  {args.name}  {path}")
+        db.save(args.db)
+    else:
+        db = Fingerprints.load(args.db)
+        for path in args.files:
+            print(f"{db.match(_read(path)) or '-'}  {path}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
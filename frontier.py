@@ -0,0 +1,149 @@
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+from dataclasses import astuple
+from typing import Iterator
+
+from models import Hit
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    name  TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS pages (
+    seq   INTEGER PRIMARY KEY,
+    key   TEXT NOT NULL UNIQUE,
+    url   TEXT NOT NULL,
+    depth INTEGER NOT NULL,
+    state INTEGER NOT NULL DEFAULT 0,
+    owner INTEGER,
+    hits  TEXT
+);
+CREATE INDEX IF NOT EXISTS pages_state ON pages (state, seq);
+"""
+
+QUEUED, CLAIMED, DONE, SKIPPED = 0, 1, 2, 3
+
+
+def _alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+class Frontier:
+    """A crawl frontier in one SQLite file, shared by any number of crawler
+    processes on this machine working on the same target.
+
+    Pages are keyed by their crawl key and handed out in the order they were
+    found, so a single process visits them in the same breadth-first order
+    as the in-memory queue. ``claim`` takes the oldest queued page for this
+    process; ``complete`` records the links it queued and the hits it
+    registered in the same transaction that marks it done, so a page is
+    either fully accounted for or, if its process died, claimed again by
+    the next caller.
+    """
+
+    def __init__(self, path: str, target: str):
+        self._db = sqlite3.connect(path, isolation_level=None, timeout=60)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(_SCHEMA)
+        self._pid = os.getpid()
+        self._db.execute("BEGIN IMMEDIATE")
+        try:
+            row = self._db.execute("SELECT value FROM meta WHERE name = 'target'").fetchone()
+            if row is None:
+                self._db.execute("INSERT INTO meta VALUES ('target', ?)", (target,))
+            elif row[0] != target:
+                raise ValueError(f"frontier {path} belongs to {row[0]}, not {target}")
+            self._db.execute("COMMIT")
+        except BaseException:
+            self._db.execute("ROLLBACK")
+            self._db.close()
+            raise
+
+    def seed(self, key: str, url: str):
+        self._db.execute("INSERT OR IGNORE INTO pages (key, url, depth) VALUES (?, ?, 0)", (key, url))
+
+    def size(self) -> int:
+        """Pages found so far, visited or not, less those skipped (see
+        ``complete``); the counterpart of seen_keys. Rows are never deleted,
+        so the largest seq (the rowid) is the row count, without a scan."""
+        return self._db.execute(
+            "SELECT IFNULL((SELECT MAX(seq) FROM pages), 0)"
+            " - IFNULL((SELECT CAST(value AS INTEGER) FROM meta WHERE name = 'skipped'), 0)"
+        ).fetchone()[0]
+
+    def claim(self) -> tuple[int, str, int] | None:
+        """Claim the oldest queued page as (seq, url, depth), or return None
+        if none is queued. Pages claimed by processes that have since exited
+        are queued again first."""
+        db = self._db
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            row = db.execute("SELECT seq, url, depth FROM pages WHERE state = ? ORDER BY seq LIMIT 1",
+                             (QUEUED,)).fetchone()
+            if row is None and self._requeue_orphans():
+                row = db.execute("SELECT seq, url, depth FROM pages WHERE state = ? "
+                                 "ORDER BY seq LIMIT 1", (QUEUED,)).fetchone()
+            if row is not None:
+                db.execute("UPDATE pages SET state = ?, owner = ? WHERE seq = ?",
+                           (CLAIMED, self._pid, row[0]))
+            db.execute("COMMIT")
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+        return row
+
+    def _requeue_orphans(self) -> bool:
+        owners = [o for (o,) in self._db.execute(
+            "SELECT DISTINCT owner FROM pages WHERE state = ?", (CLAIMED,))]
+        dead = [o for o in owners if o != self._pid and not _alive(o)]
+        for owner in dead:
+            self._db.execute("UPDATE pages SET state = ?, owner = NULL WHERE state = ? AND owner = ?",
+                             (QUEUED, CLAIMED, owner))
+        return bool(dead)
+
+    def busy(self) -> bool:
+        """Whether another live process still holds a claim, and so may queue
+        more pages."""
+        owners = [o for (o,) in self._db.execute(
+            "SELECT DISTINCT owner FROM pages WHERE state = ?", (CLAIMED,))]
+        return any(o != self._pid and _alive(o) for o in owners)
+
+    def complete(self, seq: int, links: list[tuple[str, str, int]],
+                 hits: list[tuple[str, Hit, str, dict | None]], skipped=False):
+        """Mark page ``seq`` done, queueing ``links`` as (key, url, depth)
+        unless already known and storing its registered ``hits`` as
+        (path_url, hit, source, params). A ``skipped`` page was not visited
+        and no longer counts towards ``size``."""
+        rows = [[path_url, source, params, *astuple(hit)] for path_url, hit, source, params in hits]
+        db = self._db
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            db.executemany("INSERT OR IGNORE INTO pages (key, url, depth) VALUES (?, ?, ?)", links)
+            db.execute("UPDATE pages SET state = ?, owner = NULL, hits = ? WHERE seq = ?",
+                       (SKIPPED if skipped else DONE, json.dumps(rows, separators=(",", ":")), seq))
+            if skipped:
+                db.execute("INSERT OR IGNORE INTO meta VALUES ('skipped', '0')")
+                db.execute("UPDATE meta SET value = CAST(value AS INTEGER) + 1 WHERE name = 'skipped'")
+            db.execute("COMMIT")
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+
+    def hits(self) -> Iterator[tuple[str, Hit, str, dict | None]]:
+        """Every hit stored by ``complete``, in page order, from all processes."""
+        for (data,) in self._db.execute("SELECT hits FROM pages WHERE state = ? ORDER BY seq", (DONE,)):
+            for path_url, source, params, *fields in json.loads(data):
+                yield path_url, Hit(*fields), source, params
+
+    def close(self):
+        self._db.close()
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
-from dataclasses import dataclass, field
+import sys
+from dataclasses import dataclass
 
 
 HTTP_METHODS = frozenset({"GET", "POST", "PUT", "DELETE", "PATCH", "HEAD", "OPTIONS"})
@@ -16,44 +17,100 @@ class Hit:
     rpc_method: str | None = None
 
 
-@dataclass
+# Shared stand-in for the sets most endpoints never fill; replaced by a real
+# set on first use.
+_EMPTY: frozenset = frozenset()
+
+
 class Endpoint:
-    url: str
-    kind: str = "rest"
-    methods: set = field(default_factory=set)
-    params: dict = field(default_factory=dict)
-    sources: set = field(default_factory=set)
-    gql_ops: set = field(default_factory=set)
-    rpc_methods: set = field(default_factory=set)
+    """An endpoint merged from every hit on its URL.
+
+    A crawl can hold tens of thousands of these, so they are slotted, share
+    one copy of each URL, source and parameter string, allocate the GraphQL and RPC sets
+    only when needed, and keep at most ``max_values`` distinct sample values
+    per query parameter. ``hits`` counts the hits merged in.
+    """
+
+    __slots__ = ("url", "kind", "methods", "params", "sources", "gql_ops", "rpc_methods", "hits")
+
+    def __init__(self, url: str, kind: str = "rest"):
+        self.url = sys.intern(url)
+        self.kind = kind
+        self.methods: set = set()
+        self.params: dict[str, list[str]] = {}
+        self.sources: set = set()
+        self.gql_ops: set = _EMPTY
+        self.rpc_methods: set = _EMPTY
+        self.hits = 0
+
+    def __repr__(self):
+        return f"Endpoint(url={self.url!r}, kind={self.kind!r}, hits={self.hits})"
 
     def merge(self, hit: Hit, source: str = ""):
+        self.hits += 1
         if hit.method and hit.method in HTTP_METHODS:
             self.methods.add(hit.method)
         if source:
-            self.sources.add(source)
+            self.sources.add(sys.intern(source))
         if hit.kind == "graphql" and hit.gql_op_type:
+            if self.gql_ops is _EMPTY:
+                self.gql_ops = set()
             self.gql_ops.add((hit.gql_op_type, hit.gql_op_name or "anonymous"))
         if hit.kind == "rpc" and hit.rpc_method:
+            if self.rpc_methods is _EMPTY:
+                self.rpc_methods = set()
             self.rpc_methods.add(hit.rpc_method)
 
+    def add_params(self, params: dict[str, list[str]], max_values: int):
+        for k, values in params.items():
+            kept = self.params.get(k)
+            if kept is None:
+                kept = self.params[sys.intern(k)] = []
+            for v in values:
+                if len(kept) >= max_values:
+                    break
+                if v not in kept:
+                    kept.append(sys.intern(v))
+
 
 _KIND_RANK = {"rest": 0, "rpc": 1, "graphql": 2}
 
 
+MAX_PARAM_VALUES = 20
+
+
 class EndpointStore:
-    def __init__(self):
+    def __init__(self, max_param_values: int = MAX_PARAM_VALUES):
         self._map: dict[str, Endpoint] = {}
+        self.max_param_values = max_param_values
+        # URLs added to or merged into since the last drain_touched(), kept
+        # only once track_changes() has been called.
+        self._touched: set[str] | None = None
 
     def add(self, url: str, hit: Hit, source: str = "", params: dict | None = None):
-        if url not in self._map:
-            self._map[url] = Endpoint(url=url, kind=hit.kind)
-        ep = self._map[url]
+        ep = self._map.get(url)
+        if ep is None:
+            ep = Endpoint(url, kind=hit.kind)
+            self._map[ep.url] = ep
         if _KIND_RANK.get(hit.kind, 0) > _KIND_RANK.get(ep.kind, 0):
             ep.kind = hit.kind
         ep.merge(hit, source)
         if params:
-            for k, v in params.items():
-                ep.params.setdefault(k, []).extend(v)
+            ep.add_params(params, self.max_param_values)
+        if self._touched is not None:
+            self._touched.add(ep.url)
+
+    def track_changes(self):
+        if self._touched is None:
+            self._touched = set()
+
+    def drain_touched(self) -> list[Endpoint]:
+        """Endpoints added to or merged into since the last call, by URL."""
+        if not self._touched:
+            return []
+        eps = [self._map[url] for url in sorted(self._touched)]
+        self._touched.clear()
+        return eps
 
     def all(self) -> list[Endpoint]:
         return sorted(self._map.values(), key=lambda e: e.url)
@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+import heapq
+import math
+import re
+from typing import Iterable, Iterator
+from urllib.parse import urlparse
+
+# Words in a path; digits are dropped so /blog/2014/post-7 and
+# /blog/2019/post-3 share their tokens.
+_TOKEN_RE = re.compile(r"[a-z]{2,}")
+
+# Weights of the score terms. Ties (no signal at all) fall back to the
+# order pages were found in, i.e. breadth-first.
+_API_WEIGHT = 2.0
+_PARENT_WEIGHT = 1.0
+_TOKEN_WEIGHT = 1.5
+_DEPTH_WEIGHT = 0.25
+# Pseudo-observations of the overall mean yield mixed into each token's mean,
+# so a token seen once does not dominate.
+_PRIOR = 2.0
+
+
+def _tokens(url: str) -> frozenset[str]:
+    try:
+        path = urlparse(url).path.lower()
+    except ValueError:
+        return frozenset()
+    return frozenset(_TOKEN_RE.findall(path))
+
+
+class YieldQueue:
+    """Crawl queue that hands out the page expected to yield most first.
+
+    A drop-in for the crawl's ``deque`` of (url, depth): ``append`` and
+    ``popleft`` keep their meaning, with "left" the best-scoring page. A
+    page scores for an API-looking path (``api_signal``), for the yield of
+    the page that linked to it, and for the mean yield of visited pages
+    sharing its path tokens, less a little per level of depth. ``observe``
+    reports a visited page's yield (new endpoints and scripts); links
+    appended after it are credited to that page.
+
+    Token means move as pages are observed, so a stored score can go
+    stale; a page is re-scored when it reaches the top and pushed back if
+    it no longer beats the next one. Only the token term changes, so each
+    entry keeps the rest of its score and its tokens.
+    """
+
+    def __init__(self, items: Iterable[tuple[str, int]] = (), api_signal: re.Pattern | None = None):
+        self._api_signal = api_signal
+        # (-score, seq, version, url, depth, fixed part of the score, tokens)
+        self._heap: list[tuple[float, int, int, str, int, float, frozenset[str]]] = []
+        self._seq = 0
+        self._version = 0
+        self._parent_yield = 0.0
+        self._stats: dict[str, list[float]] = {}
+        self._total = 0.0
+        self._pages = 0
+        for url, depth in items:
+            self.append((url, depth))
+
+    def _mean(self) -> float:
+        return self._total / self._pages if self._pages else 0.0
+
+    def _token_score(self, tokens: frozenset[str]) -> float:
+        if not tokens or not self._pages:
+            return 0.0
+        prior = self._mean()
+        total = 0.0
+        for t in tokens:
+            s = self._stats.get(t)
+            total += (s[0] + _PRIOR * prior) / (s[1] + _PRIOR) if s else prior
+        return _TOKEN_WEIGHT * math.log1p(total / len(tokens))
+
+    def append(self, item: tuple[str, int]):
+        url, depth = item
+        fixed = _PARENT_WEIGHT * math.log1p(self._parent_yield) - _DEPTH_WEIGHT * depth
+        if self._api_signal is not None and self._api_signal.search(url):
+            fixed += _API_WEIGHT
+        tokens = _tokens(url)
+        score = fixed + self._token_score(tokens)
+        heapq.heappush(self._heap, (-score, self._seq, self._version, url, depth, fixed, tokens))
+        self._seq += 1
+
+    def popleft(self) -> tuple[str, int]:
+        heap = self._heap
+        while True:
+            _, seq, version, url, depth, fixed, tokens = heapq.heappop(heap)
+            if version == self._version or not heap:
+                return url, depth
+            score = fixed + self._token_score(tokens)
+            if -score <= heap[0][0]:
+                return url, depth
+            heapq.heappush(heap, (-score, seq, self._version, url, depth, fixed, tokens))
+
+    def observe(self, url: str, gained: int):
+        """Record that visiting ``url`` found ``gained`` new endpoints and
+        scripts; links appended next are credited with it."""
+        self._parent_yield = float(gained)
+        self._total += gained
+        self._pages += 1
+        for t in _tokens(url):
+            s = self._stats.get(t)
+            if s is None:
+                self._stats[t] = [float(gained), 1.0]
+            else:
+                s[0] += gained
+                s[1] += 1
+        self._version += 1
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def __bool__(self) -> bool:
+        return bool(self._heap)
+
+    def __iter__(self) -> Iterator[tuple[str, int]]:
+        """Queued pages, best stored score first."""
+        for entry in sorted(self._heap):
+            yield entry[3], entry[4]
@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+import json
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+
+# The profiler recording this process's stages, if --profile is on. Module
+# level so deep call sites (extractors, HTTP connections) need no plumbing.
+current: Profiler | None = None
+
+_NULL = nullcontext()
+
+
+class Stage:
+    __slots__ = ("calls", "wall", "cpu", "bytes")
+
+    def __init__(self, calls=0, wall=0.0, cpu=0.0, nbytes=0):
+        self.calls = calls
+        self.wall = wall
+        self.cpu = cpu
+        self.bytes = nbytes
+
+
+class Profiler:
+    """Wall time, CPU time of the calling thread, and bytes handled, summed
+    per named stage. Safe to record into from several threads."""
+
+    def __init__(self):
+        self.stages: dict[str, Stage] = {}
+        self._lock = threading.Lock()
+
+    def record(self, name: str, wall: float, cpu: float, nbytes: int = 0):
+        with self._lock:
+            st = self.stages.get(name)
+            if st is None:
+                st = self.stages[name] = Stage()
+            st.calls += 1
+            st.wall += wall
+            st.cpu += cpu
+            st.bytes += nbytes
+
+    @contextmanager
+    def stage(self, name: str, nbytes: int = 0):
+        w0 = time.perf_counter()
+        c0 = time.thread_time()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - w0, time.thread_time() - c0, nbytes)
+
+    def merge(self, stats: dict[str, tuple]):
+        with self._lock:
+            for name, (calls, wall, cpu, nbytes) in stats.items():
+                st = self.stages.get(name)
+                if st is None:
+                    st = self.stages[name] = Stage()
+                st.calls += calls
+                st.wall += wall
+                st.cpu += cpu
+                st.bytes += nbytes
+
+    def stats(self) -> dict[str, tuple]:
+        with self._lock:
+            return {n: (s.calls, s.wall, s.cpu, s.bytes) for n, s in self.stages.items()}
+
+    def to_json(self) -> str:
+        return json.dumps({
+            name: {"calls": calls, "wall_s": round(wall, 6), "cpu_s": round(cpu, 6), "bytes": nbytes}
+            for name, (calls, wall, cpu, nbytes) in sorted(self.stats().items())
+        }, indent=2)
+
+    def table(self) -> str:
+        rows = sorted(self.stats().items(), key=lambda kv: -kv[1][1])
+        width = max([len(n) for n in self.stages] + [5])
+        out = [f"{'stage':<{width}}  {'calls':>8}  {'wall s':>9}  {'cpu s':>9}  {'MB':>9}  {'MB/s':>8}"]
+        for name, (calls, wall, cpu, nbytes) in rows:
+            mb = nbytes / 1e6
+            rate = f"{mb / wall:8.1f}" if nbytes and wall > 0 else f"{'':>8}"
+            size = f"{mb:9.2f}" if nbytes else f"{'':>9}"
+            out.append(f"{name:<{width}}  {calls:>8}  {wall:9.3f}  {cpu:9.3f}  {size}  {rate}")
+        return "\n".join(out)
+
+
+def enable() -> Profiler:
+    global current
+    current = Profiler()
+    return current
+
+
+def stage(name: str, nbytes: int = 0):
+    """Time a block as ``name`` when profiling is on; a no-op otherwise."""
+    if current is None:
+        return _NULL
+    return current.stage(name, nbytes)
+
+
+def collect(fn, *args):
+    """Run ``fn(*args)`` under a fresh profiler, for process-pool workers;
+    returns (result, stats) so the parent can merge the stats."""
+    global current
+    outer, current = current, Profiler()
+    try:
+        return fn(*args), current.stats()
+    finally:
+        current = outer
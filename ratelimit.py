@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+import threading
+import time
+
+# Responses that mean "slow down".
+BACKOFF_STATUS = frozenset({429, 503})
+
+
+class _Host:
+    __slots__ = ("limit", "inflight", "tokens", "refilled", "paused_until",
+                 "slow_start", "latency", "best")
+
+    def __init__(self, limit: float, burst: float):
+        self.limit = limit
+        self.inflight = 0
+        self.tokens = burst
+        self.refilled = time.monotonic()
+        self.paused_until = 0.0
+        # Until the first back-off the limit grows by one per good response
+        # rather than by 1/limit, so a healthy host reaches the ceiling fast.
+        self.slow_start = True
+        # Smoothed and best time to response headers, in seconds.
+        self.latency = 0.0
+        self.best = 0.0
+
+
+class RateLimiter:
+    """Per-host request admission, shared by every thread using a client.
+
+    Each host gets a token bucket refilled at ``rate`` requests per second
+    (no limit when ``rate`` is 0) holding up to ``burst`` tokens, and a
+    concurrency limit adapted AIMD-style between 1 and ``ceiling``: halved
+    on 429/503, grown while response latency stays within ``latency_slack``
+    times the best seen. A ``Retry-After`` (or a plain 429/503) pauses the
+    host for that long. With ``adaptive`` off the limit stays at ``ceiling``.
+    """
+
+    def __init__(self, rate: float = 0.0, burst: float = 1.0, ceiling: int = 6,
+                 adaptive: bool = True, initial: int = 4, latency_slack: float = 2.0):
+        self.rate = rate
+        self.burst = max(1.0, burst)
+        self.ceiling = max(1, ceiling)
+        self.adaptive = adaptive
+        self.initial = initial
+        self.latency_slack = latency_slack
+        self.throttled = 0
+        self._hosts: dict[str, _Host] = {}
+        self._cond = threading.Condition()
+
+    def _host(self, host: str) -> _Host:
+        h = self._hosts.get(host)
+        if h is None:
+            limit = min(self.initial, self.ceiling) if self.adaptive else self.ceiling
+            h = self._hosts[host] = _Host(float(limit), self.burst)
+        return h
+
+    def acquire(self, host: str):
+        """Block until a request to ``host`` may start."""
+        with self._cond:
+            h = self._host(host)
+            while True:
+                now = time.monotonic()
+                wait = h.paused_until - now
+                if wait <= 0 and self.rate > 0:
+                    h.tokens = min(self.burst, h.tokens + (now - h.refilled) * self.rate)
+                    h.refilled = now
+                    if h.tokens < 1:
+                        wait = (1 - h.tokens) / self.rate
+                if wait <= 0 and h.inflight < min(int(h.limit), self.ceiling):
+                    if self.rate > 0:
+                        h.tokens -= 1
+                    h.inflight += 1
+                    return
+                # Woken early by release() when a slot frees up.
+                self._cond.wait(wait if wait > 0 else None)
+
+    def release(self, host: str, status: int | None = None, latency: float | None = None,
+                pause: float | None = None):
+        """End a request started with acquire(). ``status`` and ``latency``
+        (seconds to response headers) drive the concurrency limit; ``pause``
+        holds back new requests to the host for that many seconds."""
+        with self._cond:
+            h = self._host(host)
+            h.inflight -= 1
+            if pause:
+                h.paused_until = max(h.paused_until, time.monotonic() + pause)
+            if status in BACKOFF_STATUS:
+                self.throttled += 1
+                if self.adaptive:
+                    h.limit = max(1.0, h.limit / 2)
+                    h.slow_start = False
+            elif status is not None and status < 500 and latency is not None:
+                h.latency = latency if not h.latency else 0.8 * h.latency + 0.2 * latency
+                h.best = latency if not h.best else min(h.best, latency)
+                if self.adaptive and h.latency <= self.latency_slack * h.best:
+                    step = 1.0 if h.slow_start else 1.0 / h.limit
+                    h.limit = min(float(self.ceiling), h.limit + step)
+            self._cond.notify_all()
+
+    def limits(self) -> dict[str, float]:
+        """Current concurrency limit per host."""
+        with self._cond:
+            return {host: h.limit for host, h in self._hosts.items()}
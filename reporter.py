@@ -1,18 +1,31 @@
 from __future__ import annotations
 
+import io
 import json
 from collections import defaultdict
+from typing import Iterable, TextIO
 from urllib.parse import urlparse, urlencode
 
 from models import Endpoint
 
 
-def markdown(endpoints: list[Endpoint], target: str) -> str:
+def markdown(endpoints: list[Endpoint], target: str, skipped: dict[str, int] | None = None) -> str:
+    buf = io.StringIO()
+    write_markdown(endpoints, target, buf, skipped)
+    return buf.getvalue()
+
+
+def write_markdown(endpoints: list[Endpoint], target: str, f: TextIO,
+                   skipped: dict[str, int] | None = None):
+    """Render the Markdown report straight to ``f``, one endpoint at a time.
+    ``skipped`` maps the page templates the crawl stopped visiting to the
+    pages skipped for each."""
     rest = [e for e in endpoints if e.kind == "rest"]
     graphql = [e for e in endpoints if e.kind == "graphql"]
     rpc = [e for e in endpoints if e.kind == "rpc"]
+    out = _LineWriter(f)
 
-    buf = [
+    out.extend([
         f"# API Endpoints — {target}\n",
         f"| Kind | Count |",
         f"|------|-------|",
@@ -21,49 +34,145 @@ def markdown(endpoints: list[Endpoint], target: str) -> str:
         f"| RPC | {len(rpc)} |",
         f"| **Total** | **{len(endpoints)}** |",
         "",
-    ]
+    ])
 
     if rest:
-        buf.append("## REST\n")
+        out.append("## REST\n")
         for prefix, eps in _group(rest).items():
-            buf.append(f"### {prefix}\n")
+            out.append(f"### {prefix}\n")
             for ep in eps:
-                buf.extend(_render_rest(ep))
-        buf.append("---\n")
+                out.extend(_render_rest(ep))
+        out.append("---\n")
 
     if graphql:
-        buf.append("## GraphQL\n")
+        out.append("## GraphQL\n")
         for ep in graphql:
-            buf.extend(_render_graphql(ep))
-        buf.append("---\n")
+            out.extend(_render_graphql(ep))
+        out.append("---\n")
 
     if rpc:
-        buf.append("## RPC\n")
+        out.append("## RPC\n")
         for ep in rpc:
-            buf.extend(_render_rpc(ep))
-        buf.append("---\n")
+            out.extend(_render_rpc(ep))
+        out.append("---\n")
+
+    if skipped:
+        out.extend([
+            "## Skipped page templates\n",
+            "| Template | Pages skipped |",
+            "|----------|---------------|",
+            *(f"| `{t}` | {n} |" for t, n in skipped.items()),
+            "",
+        ])
 
-    return "\n".join(buf)
+
+def endpoint_record(ep: Endpoint) -> dict:
+    rec: dict = {
+        "url": ep.url,
+        "kind": ep.kind,
+        "methods": sorted(ep.methods) or ["UNKNOWN"],
+        "params": dict(ep.params),
+        "sources": sorted(ep.sources),
+    }
+    if ep.gql_ops:
+        rec["gql_operations"] = [
+            {"type": t, "name": n} for t, n in sorted(ep.gql_ops)
+        ]
+    if ep.rpc_methods:
+        rec["rpc_methods"] = sorted(ep.rpc_methods)
+    return rec
 
 
 def json_report(endpoints: list[Endpoint]) -> str:
-    records = []
-    for ep in endpoints:
-        rec: dict = {
-            "url": ep.url,
-            "kind": ep.kind,
-            "methods": sorted(ep.methods) or ["UNKNOWN"],
-            "params": dict(ep.params),
-            "sources": sorted(ep.sources),
-        }
-        if ep.gql_ops:
-            rec["gql_operations"] = [
-                {"type": t, "name": n} for t, n in sorted(ep.gql_ops)
-            ]
-        if ep.rpc_methods:
-            rec["rpc_methods"] = sorted(ep.rpc_methods)
-        records.append(rec)
-    return json.dumps(records, indent=2)
+    buf = io.StringIO()
+    write_json(endpoints, buf)
+    return buf.getvalue()
+
+
+def write_json(endpoints: list[Endpoint], f: TextIO):
+    """Write the same document as ``json.dumps(records, indent=2)``, one
+    record at a time."""
+    if not endpoints:
+        f.write("[]")
+        return
+    f.write("[")
+    for i, ep in enumerate(endpoints):
+        rec = json.dumps(endpoint_record(ep), indent=2)
+        f.write(",\n  " if i else "\n  ")
+        f.write(rec.replace("\n", "\n  "))
+    f.write("\n]")
+
+
+class NdjsonWriter:
+    """Appends endpoint records to ``f``, one JSON object per line, while the
+    crawl runs. A record is written when an endpoint is first found and again
+    whenever its kind, methods, parameters or operations grow, so the last
+    line for a URL is its final state; ``sources`` are those known when the
+    line was written."""
+
+    def __init__(self, f: TextIO):
+        self._f = f
+        self._written: dict[str, tuple] = {}
+
+    def update(self, endpoints: Iterable[Endpoint]):
+        for ep in endpoints:
+            sig = (ep.kind, len(ep.methods), len(ep.params),
+                   sum(map(len, ep.params.values())), len(ep.gql_ops), len(ep.rpc_methods))
+            if self._written.get(ep.url) == sig:
+                continue
+            self._written[ep.url] = sig
+            self._f.write(json.dumps(endpoint_record(ep)) + "\n")
+        self._f.flush()
+
+
+class _LineWriter:
+    """Writes items the way ``"\\n".join(items)`` would, without the list."""
+
+    def __init__(self, f: TextIO):
+        self._f = f
+        self._first = True
+
+    def append(self, line: str):
+        if not self._first:
+            self._f.write("\n")
+        self._first = False
+        self._f.write(line)
+
+    def extend(self, lines: Iterable[str]):
+        for line in lines:
+            self.append(line)
+
+
+def diff_markdown(diff: dict, target: str) -> str:
+    buf = [
+        f"# API Endpoint Changes — {target}\n",
+        "| Change | Count |",
+        "|--------|-------|",
+        f"| Added | {len(diff['added'])} |",
+        f"| Removed | {len(diff['removed'])} |",
+        f"| Changed | {len(diff['changed'])} |",
+        "",
+    ]
+    for title, recs in (("Added", diff["added"]), ("Removed", diff["removed"])):
+        if recs:
+            buf.append(f"## {title}\n")
+            for rec in recs:
+                buf.append(f"- {', '.join(rec['methods'])} `{rec['url']}` ({rec['kind']})")
+            buf.append("")
+    if diff["changed"]:
+        buf.append("## Changed\n")
+        for ch in diff["changed"]:
+            buf.append(f"### `{ch['url']}`\n")
+            buf.append("| Field | Before | After |")
+            buf.append("|-------|--------|-------|")
+            for f in ch["fields"]:
+                buf.append(f"| {f} | `{json.dumps(ch['before'].get(f))}` | `{json.dumps(ch['after'].get(f))}` |")
+            buf.append("")
+    return "\n".join(buf)
+
+
+def diff_json(diff: dict) -> str:
+    return json.dumps(diff, indent=2)
 
 
 def _group(endpoints: list[Endpoint]) -> dict[str, list[Endpoint]]:
@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+import json
+import os
+from dataclasses import asdict, dataclass, field
+
+from extractors import PageSignals
+from models import Hit
+
+_VERSION = 2
+
+
+@dataclass
+class State:
+    """What a previous run left behind: its report records, the content
+    digest of every page and script it fetched, and the analysis of each
+    distinct body so unchanged ones need not be parsed or extracted again."""
+    target: str = ""
+    report: list[dict] = field(default_factory=list)
+    assets: dict[str, bytes] = field(default_factory=dict)
+    js_hits: dict[bytes, list[tuple[Hit, bool, str]]] = field(default_factory=dict)
+    pages: dict[bytes, tuple[PageSignals, list[bytes]]] = field(default_factory=dict)
+
+
+def load(path: str, target: str) -> State | None:
+    """Read the state saved for ``target``; None if there is none yet.
+    Analyses are only reused if the state was saved for this target."""
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        raw = json.load(f)
+    if raw.get("version") != _VERSION:
+        return None
+    state = State(
+        target=raw["target"],
+        report=raw["report"],
+        assets={url: bytes.fromhex(h) for url, h in raw["assets"].items()},
+    )
+    if state.target != target:
+        return state
+    state.js_hits = {
+        bytes.fromhex(h): [(Hit(**hit), rel, via) for hit, rel, via in hits]
+        for h, hits in raw["js"].items()
+    }
+    for h, page in raw["pages"].items():
+        signals = PageSignals(
+            forms=[tuple(f) for f in page["forms"]],
+            data_urls=page["data_urls"],
+            script_srcs=page["script_srcs"],
+            links=page["links"],
+        )
+        state.pages[bytes.fromhex(h)] = (signals, [bytes.fromhex(k) for k in page["inline"]])
+    return state
+
+
+def save(path: str, crawler, report: list[dict]):
+    """Write the state of a finished crawl, keeping only the analyses of
+    bodies that were actually seen in it. Scripts cut off by the extraction
+    budget, and pages holding such inline scripts, are left out so the next
+    run analyses them again."""
+    pages = {}
+    js = {}
+    for key in crawler.assets.values():
+        if key in crawler.over_budget:
+            continue
+        if key in crawler._pages:
+            signals, inline = crawler._pages[key]
+            if any(k in crawler.over_budget for k in inline):
+                continue
+            pages[key.hex()] = {
+                "forms": signals.forms,
+                "data_urls": signals.data_urls,
+                "script_srcs": signals.script_srcs,
+                "links": signals.links,
+                "inline": [k.hex() for k in inline],
+            }
+            for k in inline:
+                js[k.hex()] = crawler._js_hits[k]
+        elif key in crawler._js_hits:
+            js[key.hex()] = crawler._js_hits[key]
+    raw = {
+        "version": _VERSION,
+        "target": crawler.base_url,
+        "report": report,
+        "assets": {url: key.hex() for url, key in crawler.assets.items()},
+        "pages": pages,
+        "js": {h: [(asdict(hit), rel, via) for hit, rel, via in hits] for h, hits in js.items()},
+    }
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(raw, f)
+    os.replace(tmp, path)
+
+
+def changed_assets(old: State, assets: dict[str, bytes]) -> tuple[int, int, int]:
+    """(new, changed, unchanged) counts of this run's assets against ``old``."""
+    new = changed = same = 0
+    for url, key in assets.items():
+        prev = old.assets.get(url)
+        if prev is None:
+            new += 1
+        elif prev != key:
+            changed += 1
+        else:
+            same += 1
+    return new, changed, same
+
+
+def _same(field: str, a, b) -> bool:
+    if field == "params" and isinstance(a, dict) and isinstance(b, dict):
+        # Sample values are kept in the order scripts happened to finish in.
+        return a.keys() == b.keys() and all(set(a[name]) == set(b[name]) for name in a)
+    return a == b
+
+
+def diff(old: list[dict], new: list[dict]) -> dict:
+    """Compare two ``json_report`` record lists by endpoint URL."""
+    before = {r["url"]: r for r in old}
+    after = {r["url"]: r for r in new}
+    changed = []
+    for url in sorted(before.keys() & after.keys()):
+        a, b = before[url], after[url]
+        fields = sorted(k for k in a.keys() | b.keys() if not _same(k, a.get(k), b.get(k)))
+        if fields:
+            changed.append({"url": url, "fields": fields, "before": a, "after": b})
+    return {
+        "added": [after[u] for u in sorted(after.keys() - before.keys())],
+        "removed": [before[u] for u in sorted(before.keys() - after.keys())],
+        "changed": changed,
+    }
@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+import hashlib
+import sys
+from array import array
+from typing import Iterable
+
+# Most slots in use before the table doubles.
+_MAX_LOAD = 2 / 3
+
+
+def _hash(key: str) -> int:
+    h = int.from_bytes(hashlib.blake2b(key.encode("utf-8", "surrogatepass"), digest_size=8).digest(),
+                       "little")
+    # 0 marks an empty slot.
+    return h or 1
+
+
+class SeenSet:
+    """A set of strings that keeps only a 64-bit hash of each, in one
+    open-addressed array: 12 to 24 bytes per member however long the string,
+    against well over 100 for a URL in a ``set[str]``.
+
+    Two different strings collide with probability about ``n / 2**64`` per
+    lookup, so for any crawl size a page is wrongly treated as seen far less
+    often than it would be lost to a network error. Members cannot be
+    listed, only tested; ``to_bytes``/``from_bytes`` save and restore the
+    set, and the hash is stable across processes for that reason.
+    """
+
+    def __init__(self, keys: Iterable[str] = ()):
+        self._slots = array("Q", bytes(8 * 64))
+        self._len = 0
+        self.update(keys)
+
+    def add(self, key: str) -> bool:
+        """Add ``key``; return whether it was new."""
+        return self._add(_hash(key))
+
+    def _add(self, h: int) -> bool:
+        slots = self._slots
+        mask = len(slots) - 1
+        i = h & mask
+        while True:
+            v = slots[i]
+            if v == h:
+                return False
+            if not v:
+                break
+            i = (i + 1) & mask
+        slots[i] = h
+        self._len += 1
+        if self._len > _MAX_LOAD * len(slots):
+            self._grow()
+        return True
+
+    def _grow(self):
+        old = self._slots
+        self._slots = array("Q", bytes(16 * len(old)))
+        self._len = 0
+        for h in old:
+            if h:
+                self._add(h)
+
+    def update(self, keys: Iterable[str]):
+        for key in keys:
+            self._add(_hash(key))
+
+    def __contains__(self, key: str) -> bool:
+        h = _hash(key)
+        slots = self._slots
+        mask = len(slots) - 1
+        i = h & mask
+        while True:
+            v = slots[i]
+            if v == h:
+                return True
+            if not v:
+                return False
+            i = (i + 1) & mask
+
+    def __len__(self) -> int:
+        return self._len
+
+    def nbytes(self) -> int:
+        return len(self._slots) * self._slots.itemsize
+
+    def to_bytes(self) -> bytes:
+        """The members' hashes, little-endian, without the empty slots."""
+        out = array("Q", (h for h in self._slots if h))
+        if sys.byteorder == "big":
+            out.byteswap()
+        return out.tobytes()
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> SeenSet:
+        hashes = array("Q")
+        hashes.frombytes(data)
+        if sys.byteorder == "big":
+            hashes.byteswap()
+        s = cls()
+        for h in hashes:
+            s._add(h)
+        return s